@@ -0,0 +1,219 @@
+"""
+This module contains the bid curves of the market agents
+as one columnar table, with one row per bid block:
+    Agent, Block, Period, Quantity, Price
+The quantities (pbG / pbD) and prices (lbG / lbD) of the
+per-agent files of report.run (data/<agent>_<param>.dat,
+one row per period and one column per block) are read
+in one pass: the files are concatenated and parsed at once.
+
+The table can be cached as .npz, .parquet or .csv, so that
+the bid files are only read the first time. The cache holds
+the signature of the table (see bid_signature): it is only
+read if it was written for the same agents and periods, from
+bid files which have not changed since. The models take the
+bid parameters straight from the table (see bid_params).
+"""
+import json
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BID_COLUMNS = ["Agent", "Block", "Period", "Quantity", "Price"]
+
+# Quantity and price parameters of the generators and demands
+BID_PARAMS = {"G": ("pbG", "lbG"), "D": ("pbD", "lbD")}
+
+
+def _bid_paths(agents: list, param: str, data_dir: str) -> list[str]:
+    return [os.path.join(data_dir, f"{a}_{param}.dat") for a in agents]
+
+
+def _read_grids(paths: list[str], n_periods: int) -> np.ndarray:
+    # (files, periods, blocks) values of the bid files
+    if not paths:
+        return np.zeros((0, n_periods, 0))
+    tokens, counts = [], []
+    for path in paths:
+        with open(path) as f:
+            values = f.read().split()
+        tokens.extend(values)
+        counts.append(len(values))
+
+    # Every file must hold the same (periods x blocks) grid, otherwise
+    # the values of the following files would be shifted
+    n_values = counts[0]
+    if n_values == 0 or n_values % n_periods != 0:
+        raise ValueError(
+            f"{paths[0]} has {n_values} values, not a multiple of the {n_periods} periods"
+        )
+    for path, count in zip(paths, counts):
+        if count != n_values:
+            raise ValueError(f"{path} has {count} values, {paths[0]} has {n_values}")
+
+    values = np.array(tokens, dtype=float)
+    return values.reshape(len(paths), n_periods, n_values // n_periods)
+
+
+def read_bid_files(agents: list, side: str, data_dir: str, n_periods: int) -> pd.DataFrame:
+    """
+    Bid table of the agents of side ("G" or "D") from their
+    quantity and price files
+    """
+    agents = list(agents)
+    quantity_param, price_param = BID_PARAMS[side]
+    quantities = _read_grids(_bid_paths(agents, quantity_param, data_dir), n_periods)
+    prices = _read_grids(_bid_paths(agents, price_param, data_dir), n_periods)
+    if quantities.shape != prices.shape:
+        raise ValueError(
+            f"The {quantity_param} files have {quantities.shape[2]} blocks, "
+            f"the {price_param} files {prices.shape[2]}"
+        )
+
+    n_agents, _, n_blocks = quantities.shape
+    agent, period, block = np.meshgrid(
+        np.arange(n_agents),
+        np.arange(1, n_periods + 1),
+        np.arange(1, n_blocks + 1),
+        indexing="ij",
+    )
+    return pd.DataFrame(
+        {
+            "Agent": np.array(agents, dtype=str)[agent.ravel()],
+            "Block": block.ravel(),
+            "Period": period.ravel(),
+            "Quantity": quantities.ravel(),
+            "Price": prices.ravel(),
+        }
+    )
+
+
+def bid_signature(generators: list, demands: list, data_dir: str, n_periods: int) -> str:
+    """
+    Signature of the bid table of the generators and demands:
+    the agents, the number of periods, and the size and
+    modification time of every bid file, as JSON
+    """
+    files = {}
+    for agents, side in [(generators, "G"), (demands, "D")]:
+        for param in BID_PARAMS[side]:
+            for path in _bid_paths(agents, param, data_dir):
+                stat = os.stat(path)
+                files[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+    return json.dumps(
+        {
+            "G": [str(g) for g in generators],
+            "D": [str(d) for d in demands],
+            "nT": int(n_periods),
+            "Files": files,
+        },
+        sort_keys=True,
+    )
+
+
+def read_signature(path: str) -> Optional[str]:
+    """
+    Signature stored with the bid table of a file (None if
+    it was written without one)
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as arrays:
+            return str(arrays["Signature"]) if "Signature" in arrays else None
+    if path.endswith(".parquet"):
+        import pyarrow.parquet
+
+        metadata = pyarrow.parquet.read_schema(path).metadata or {}
+        signature = metadata.get(b"signature")
+        return None if signature is None else signature.decode()
+    with open(path) as f:
+        line = f.readline()
+    return line[1:].strip() if line.startswith("#") else None
+
+
+def read_bids(path: str) -> pd.DataFrame:
+    """
+    Bid table from a .npz, .parquet or .csv file
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as arrays:
+            return pd.DataFrame({column: arrays[column] for column in BID_COLUMNS})
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=BID_COLUMNS)
+    return pd.read_csv(path, usecols=BID_COLUMNS, comment="#")
+
+
+def write_bids(bids: pd.DataFrame, path: str, signature: Optional[str] = None):
+    """
+    Write the bid table to a .npz, .parquet or .csv file, with
+    its signature (in the .npz arrays, the Parquet metadata or
+    a # header line of the CSV) if given
+    """
+    if path.endswith(".npz"):
+        arrays = {column: bids[column].to_numpy() for column in BID_COLUMNS}
+        arrays["Agent"] = arrays["Agent"].astype(str)  # Not pickled objects
+        if signature is not None:
+            arrays["Signature"] = np.array(signature)
+        np.savez(path, **arrays)
+    elif path.endswith(".parquet"):
+        import pyarrow
+        import pyarrow.parquet
+
+        table = pyarrow.Table.from_pandas(bids[BID_COLUMNS], preserve_index=False)
+        if signature is not None:
+            metadata = {**(table.schema.metadata or {}), b"signature": signature.encode()}
+            table = table.replace_schema_metadata(metadata)
+        pyarrow.parquet.write_table(table, path)
+    else:
+        with open(path, "w") as f:
+            if signature is not None:
+                f.write(f"#{signature}\n")
+            bids[BID_COLUMNS].to_csv(f, index=False)
+
+
+def load_bids(
+    generators: list,
+    demands: list,
+    data_dir: str,
+    n_periods: int,
+    cache: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Bid table of the generators and demands, from the cache
+    if it exists and its signature matches, otherwise from
+    the bid files (and then written to the cache, if given)
+    """
+    if cache is not None:
+        signature = bid_signature(generators, demands, data_dir, n_periods)
+        if os.path.exists(cache):
+            if read_signature(cache) == signature:
+                return read_bids(cache)
+            print(f"Bid cache {cache} is out of date, reading the bid files")
+
+    bids = pd.concat(
+        [
+            read_bid_files(generators, "G", data_dir, n_periods),
+            read_bid_files(demands, "D", data_dir, n_periods),
+        ],
+        ignore_index=True,
+    )
+    if cache is not None:
+        write_bids(bids, cache, signature)
+    return bids
+
+
+def bid_params(bids: pd.DataFrame, agents: list, side: str) -> dict:
+    """
+    Quantity and price parameters (e.g. pbG and lbG) of the
+    agents of side, indexed by (agent, block, period)
+    """
+    quantity_param, price_param = BID_PARAMS[side]
+    bids = bids[bids["Agent"].isin(list(agents))]
+    index = list(
+        zip(bids["Agent"].tolist(), bids["Block"].tolist(), bids["Period"].tolist())
+    )
+    return {
+        quantity_param: dict(zip(index, bids["Quantity"].tolist())),
+        price_param: dict(zip(index, bids["Price"].tolist())),
+    }
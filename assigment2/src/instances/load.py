@@ -0,0 +1,62 @@
+"""
+This module contains the loading of the IEEE14 market
+clearing instance of the assignment: the AMPL data file
+(grid, generation units and sets) and the bid table of
+the agents (see bids.py).
+"""
+import os
+from typing import Optional
+
+import pandas as pd
+from pyomo.environ import AbstractModel, ConcreteModel, DataPortal
+
+from instances.bids import bid_params, load_bids
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DATA_FILE = "ass2_tcmpa_IEEE14_uc.dat"
+
+
+def load_data(
+    abstract_model: AbstractModel,
+    data_dir: str = DATA_DIR,
+    data_file: str = DATA_FILE,
+    bids: Optional[pd.DataFrame] = None,
+    cache: Optional[str] = None,
+) -> DataPortal:
+    """
+    DataPortal with the AMPL data file and the bids of all the
+    agents: those of the bid table bids if given, otherwise
+    those of the bid files of data_dir (or of their cache)
+    """
+    data = DataPortal(model=abstract_model)
+    data.load(filename=os.path.join(data_dir, data_file))
+
+    # As in model_mic.mod, the lines are the pairs of buses with capacity
+    data["LINES"] = [line for line, smax in data["smax"].items() if smax > 0]
+
+    if bids is None:
+        bids = load_bids(data["G"], data["D"], data_dir, data["nT"], cache)
+    for side in ["G", "D"]:
+        for param, values in bid_params(bids, data[side], side).items():
+            data[param] = values
+
+    return data
+
+
+def build_instance(
+    abstract_model: AbstractModel,
+    data_dir: str = DATA_DIR,
+    data_file: str = DATA_FILE,
+    bids: Optional[pd.DataFrame] = None,
+    cache: Optional[str] = None,
+) -> ConcreteModel:
+    return abstract_model.create_instance(
+        load_data(abstract_model, data_dir, data_file, bids, cache)
+    )
+
+
+def generator_buses(instance: ConcreteModel) -> dict:
+    """
+    Bus of every generator (Gen_Bus in report.run)
+    """
+    return {g: n for n in instance.GB for g in instance.GB[n]}
@@ -0,0 +1,97 @@
+import argparse
+
+from pyomo.environ import value
+
+from instances.load import build_instance
+from mic import print_finances, run_mic
+from models.mic import model
+from screening import screen_mic
+
+
+def print_schedule(instance, result, problem):
+    print(f"\n\n>>> {problem} HOURLY SCHEDULE (MW){' & PRICES' if problem == 'MPA' else ''} <<<")
+    header = f"{'Hour':<6}" + "".join(f"{g:>10}" for g in instance.G)
+    if problem == "MPA":
+        header += f"{'PRICE':>12}"
+    print(header)
+
+    first = instance.G.first()
+    for t in instance.T:
+        row = f"{t:<6d}" + "".join(
+            f"{value(instance.pg_total[g, t]):10.2f}" for g in instance.G
+        )
+        if problem == "MPA":
+            row += f"{result.prices[first, t]:12.2f}"
+        print(row)
+
+
+def print_timing(result, problem):
+    mip_time = sum(h["MIP_Time"] for h in result.history)
+    lp_time = sum(h["LP_Time"] for h in result.history)
+    print(
+        f"\n{problem}: {len(result.history)} iterations | "
+        f"MIP {mip_time:.2f}s | LP {lp_time:.2f}s | Total {mip_time + lp_time:.2f}s"
+    )
+
+
+def print_screening(instance, result, problem):
+    loss = result.unconstrained_welfare - result.welfare
+    status = "CONVERGENCE" if result.converged else "NO CONVERGENCE"
+    print(f"\n>>> {status} {problem} SCREENING in {len(result.history)} ITERATIONS <<<")
+    flags = {g: " [CUT]" for g in result.excluded}
+    print_finances(instance, result.finances, flags, problem)
+    print(
+        f"Total Welfare: {result.welfare:.2f} | "
+        f"Welfare Loss: {loss:.2f} ({100 * loss / abs(result.unconstrained_welfare):.4f}%) | "
+        f"Time: {result.wall_time:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MPA and TCMPA with the MIC heuristic")
+    parser.add_argument("--max-iter", type=int, default=20)
+    parser.add_argument("--epsilon", type=float, default=1e-3)
+    parser.add_argument(
+        "--ptdf",
+        action="store_true",
+        help="TCMPA with the PTDF network and lazy line limits (TCMPA_PTDF)",
+    )
+    parser.add_argument(
+        "--bid-cache",
+        default=None,
+        help="cache of the bid table (.npz or .parquet), read instead of the bid files if up to date",
+    )
+    parser.add_argument(
+        "--screening",
+        action="store_true",
+        help="screen candidate exclusion sets in parallel instead of excluding all violators",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    instance = build_instance(model, cache=args.bid_cache)
+
+    for problem in ["MPA", "TCMPA_PTDF" if args.ptdf else "TCMPA"]:
+        print("\n" + "#" * 40)
+        print(f"### STARTING {problem} ###")
+        print("#" * 40)
+
+        if args.screening:
+            result = screen_mic(
+                problem,
+                max_iter=args.max_iter,
+                epsilon=args.epsilon,
+                max_workers=args.workers,
+                cache=args.bid_cache,
+            )
+            print_screening(instance, result, problem)
+            continue
+
+        result = run_mic(
+            instance,
+            problem,
+            max_iter=args.max_iter,
+            epsilon=args.epsilon,
+        )
+        print_schedule(instance, result, problem)
+        print_timing(result, problem)
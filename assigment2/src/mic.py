@@ -0,0 +1,279 @@
+"""
+This module contains the MIC (Minimum Income Condition)
+heuristic of report.run, for the MPA and TCMPA problems
+of models/mic.py. Every iteration
+    1. solves the unit-commitment MIP
+    2. fixes the commitment U and solves the LP, whose
+       balance duals give the prices
+    3. excludes the generators whose cost exceeds their
+       revenue, through the Heuristic_Constraint cuts
+until no eligible generator violates its MIC.
+
+Every clearing builds its own solver models, as the AMPL
+script does. Keeping them alive through the iterations, with
+the previous commitment as MIP start, is slower on IEEE14:
+the MIP dominates the time and the start slows it down.
+
+In the TCMPA_PTDF problem, every solve is repeated with the
+limits of the lines found overloaded (see network.py), which
+are kept through the iterations. Before the MIP, the limits
+are screened on its (much cheaper) LP relaxation, so that
+the MIP is seldom solved more than once.
+"""
+from typing import NamedTuple, Optional
+
+from pyomo.contrib.solver.solvers.highs import Highs
+from pyomo.environ import Binary, ConcreteModel, NonNegativeReals, UnitInterval, value
+
+from instances.load import generator_buses
+from models.mic import heuristic_cut_rhs, select_problem
+from network import PTDFNetwork
+
+
+class Clearing(NamedTuple):
+    welfare: float
+    prices: dict
+    finances: dict
+    mip_time: float
+    lp_time: float
+
+
+class MICResult(NamedTuple):
+    eligible: list
+    converged: bool
+    welfare: float
+    prices: dict
+    finances: dict
+    history: list[dict]
+
+
+def fix_commitment(instance: ConcreteModel):
+    # Fixed and continuous: HiGHS only returns duals for LPs
+    for u in instance.U.values():
+        u.fix(round(value(u)))
+        u.domain = NonNegativeReals
+
+
+def relax_commitment(instance: ConcreteModel):
+    for u in instance.U.values():
+        u.domain = UnitInterval
+
+
+def unfix_commitment(instance: ConcreteModel):
+    for u in instance.U.values():
+        u.unfix()
+        u.domain = Binary
+
+
+def solve_problem(solver: Highs, instance: ConcreteModel, network=None, tol=1e-6):
+    """
+    Solve the instance and, with a PTDF network, solve it
+    again with the limits of the overloaded lines, until no
+    line is overloaded. Returns the results of the last solve
+    and the total wall time.
+    """
+    results = solver.solve(instance)
+    wall_time = results.timing_info.wall_time
+    while network is not None and network.add_violated_limits(instance, tol):
+        results = solver.solve(instance)
+        wall_time += results.timing_info.wall_time
+    return results, wall_time
+
+
+def market_prices(
+    instance: ConcreteModel, duals: dict, problem: str, network=None
+) -> dict:
+    """
+    Price of every generator and period: the System_Balance
+    dual (MPA) or the Node_Balance dual of its bus (TCMPA),
+    or its nodal price from the PTDF network (TCMPA_PTDF)
+    """
+    if problem == "MPA":
+        return {
+            (g, t): abs(duals[instance.System_Balance[t]])
+            for g in instance.G
+            for t in instance.T
+        }
+    gen_bus = generator_buses(instance)
+    if problem == "TCMPA_PTDF":
+        nodal = network.nodal_prices(instance, duals, sorted(set(gen_bus.values())))
+        return {
+            (g, t): abs(nodal[gen_bus[g], t]) for g in instance.G for t in instance.T
+        }
+    return {
+        (g, t): abs(duals[instance.Node_Balance[gen_bus[g], t]])
+        for g in instance.G
+        for t in instance.T
+    }
+
+
+def generator_finances(instance: ConcreteModel, prices: dict) -> dict:
+    """
+    Energy, cost, revenue and profit of every generator
+    """
+    finances = {}
+    for g in instance.G:
+        cost = sum(
+            value(instance.lbG[g, b, t]) * value(instance.P_G[g, b, t])
+            for t in instance.T
+            for b in instance.bG
+        )
+        revenue = sum(prices[g, t] * value(instance.pg_total[g, t]) for t in instance.T)
+        finances[g] = {
+            "Energy": sum(value(instance.pg_total[g, t]) for t in instance.T),
+            "Cost": cost,
+            "Revenue": revenue,
+            "Profit": revenue - cost,
+        }
+    return finances
+
+
+def clear_market(
+    instance: ConcreteModel, problem: str, network: Optional[PTDFNetwork] = None
+) -> Clearing:
+    """
+    Solve the MIP, fix the commitment and solve the LP for the
+    prices (the commitment is left fixed)
+    """
+    mip_solver = Highs()
+
+    mip_time = 0.0
+    if network is not None:
+        relax_commitment(instance)
+        _, mip_time = solve_problem(mip_solver, instance, network)
+        unfix_commitment(instance)
+
+    _, wall_time = solve_problem(mip_solver, instance, network)
+    mip_time += wall_time
+
+    fix_commitment(instance)
+    lp, lp_time = solve_problem(Highs(), instance, network)
+
+    prices = market_prices(instance, lp.solution_loader.get_duals(), problem, network)
+    return Clearing(
+        welfare=value(instance.obj),
+        prices=prices,
+        finances=generator_finances(instance, prices),
+        mip_time=mip_time,
+        lp_time=lp_time,
+    )
+
+
+def mic_violations(finances: dict, eligible: list, epsilon: float) -> list:
+    """
+    Eligible generators whose cost exceeds their revenue
+    """
+    return [
+        g for g in eligible if finances[g]["Cost"] > finances[g]["Revenue"] + epsilon
+    ]
+
+
+def exclude_generator(instance: ConcreteModel, g):
+    for t in instance.T:
+        instance.Heuristic_Constraint.add(
+            instance.U[g, t] <= heuristic_cut_rhs(instance, g, t)
+        )
+
+
+def print_finances(instance: ConcreteModel, finances: dict, flags: dict, problem: str):
+    gen_bus = generator_buses(instance)
+    width = 70 if problem == "MPA" else 76
+    bus = "" if problem == "MPA" else f"{'Bus':<6} "
+
+    print("-" * width)
+    print(f"{'Gen':<10} {bus}{'Energy':<10} {'Cost':<12} {'Revenue':<12} {'Profit':<12}")
+    print("-" * width)
+    for g, f in finances.items():
+        bus = "" if problem == "MPA" else f"{gen_bus[g]:<6} "
+        print(
+            f"{g:<10} {bus}{f['Energy']:<10.1f} {f['Cost']:<12.1f} "
+            f"{f['Revenue']:<12.1f} {f['Profit']:<12.1f}{flags.get(g, '')}"
+        )
+    print("-" * width)
+
+
+def run_mic(
+    instance: ConcreteModel,
+    problem: str,
+    max_iter: int = 20,
+    epsilon: float = 1e-3,
+    verbose: bool = True,
+) -> MICResult:
+    """
+    Run the MIC heuristic on problem ("MPA", "TCMPA" or
+    "TCMPA_PTDF"). The history holds, per iteration, the welfare,
+    the number of violations, the MIP and LP wall times and,
+    for TCMPA_PTDF, the number of line limits of the model.
+    """
+    select_problem(instance, problem)
+    instance.Heuristic_Constraint.clear()
+    unfix_commitment(instance)
+
+    network = None
+    if problem == "TCMPA_PTDF":
+        network = PTDFNetwork(instance)
+        network.reset(instance)
+
+    eligible = list(instance.G)
+    history = []
+    converged = False
+
+    for iteration in range(1, max_iter + 1):
+        if verbose:
+            print(f"\n--- ITERATION {iteration} ({problem}) ---")
+
+        clearing = clear_market(instance, problem, network)
+        welfare, prices, finances = clearing.welfare, clearing.prices, clearing.finances
+
+        if verbose and iteration == 1:
+            case = 1 if problem == "MPA" else 2
+            print(f"\n>>> [CASE STUDY {case}] {problem} BASELINE (No MIC Enforcement) <<<")
+            flags = {g: " [LOSS]" for g, f in finances.items() if f["Profit"] < -epsilon}
+            print_finances(instance, finances, flags, problem)
+            print(f"Total Welfare: {welfare:.2f}")
+
+        # MIC violations of the eligible generators
+        if verbose:
+            print("\n---> Checking MIC Violations:")
+        violations = mic_violations(finances, eligible, epsilon)
+        for g in violations:
+            f = finances[g]
+            if verbose:
+                print(
+                    f"  + [VIOLATION] Gen {g} -> Loss: {f['Cost'] - f['Revenue']:.2f} "
+                    f"(Cost: {f['Cost']:.2f} > Rev: {f['Revenue']:.2f})"
+                )
+            eligible.remove(g)
+            exclude_generator(instance, g)
+
+        unfix_commitment(instance)
+
+        history.append(
+            {
+                "Iteration": iteration,
+                "Welfare": welfare,
+                "Violations": len(violations),
+                "MIP_Time": clearing.mip_time,
+                "LP_Time": clearing.lp_time,
+            }
+        )
+        if network is not None:
+            history[-1]["Line_Limits"] = len(network.limits)
+
+        if not violations:
+            converged = True
+            if verbose:
+                print(f"\n>>> CONVERGENCE {problem} in ITERATION {iteration} <<<")
+                flags = {g: " [CUT]" for g in instance.G if g not in eligible}
+                print_finances(instance, finances, flags, problem)
+                print(f"Total Welfare: {welfare:.2f}")
+            break
+
+    return MICResult(
+        eligible=eligible,
+        converged=converged,
+        welfare=welfare,
+        prices=prices,
+        finances=finances,
+        history=history,
+    )
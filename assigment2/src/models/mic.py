@@ -0,0 +1,274 @@
+"""
+This module contains the Pyomo port of model_mic.mod:
+the MPA and TCMPA unit-commitment market clearings,
+as an AbstractModel, with the Heuristic_Constraint
+of the MIC heuristic as a ConstraintList, to which
+the cuts of the excluded generators are added
+one at a time (see mic.py).
+
+As in the AMPL problems, both share one model, and
+select_problem activates the constraints of one of them.
+
+Unlike the dense bus x bus matrices of model_mic.mod, the
+network is stored as an edge list (LINES, with Bsusc and
+smax per line) with the incidence of every bus, so that
+the network constraints are built in O(lines + buses).
+The TCMPA_PTDF problem replaces the angles and flows of
+the TCMPA by the PTDF matrix of the grid (see network.py).
+"""
+
+from pyomo.environ import (
+    Var,
+    Param,
+    NonNegativeReals,
+    Reals,
+    RangeSet,
+    Expression,
+    Objective,
+    AbstractModel,
+    ConcreteModel,
+    maximize,
+    Set,
+    Constraint,
+    ConstraintList,
+    Binary,
+    value,
+)
+
+model = AbstractModel(name="MPA / TCMPA Market Clearing with MIC Heuristic")
+
+# Dimension parameters
+model.nT = Param()
+model.nB = Param()
+model.nbG = Param()
+model.nbD = Param()
+model.M = Param(default=100000)
+
+# Basic sets
+model.T = RangeSet(model.nT)
+model.V = RangeSet(model.nB)
+model.bG = RangeSet(model.nbG)
+model.bD = RangeSet(model.nbD)
+
+model.G = Set()
+model.D = Set()
+model.refB = Set(within=model.V)
+
+model.GB = Set(model.V, within=model.G)  # Generators of each bus (if any)
+model.DB = Set(model.V, within=model.D)  # Demands of each bus (if any)
+
+# Network, as an edge list: the lines (n, k) with capacity,
+# and the lines leaving and entering every bus
+model.LINES = Set(dimen=2, within=model.V * model.V)
+model.Bsusc = Param(model.LINES)
+model.smax = Param(model.LINES)
+
+
+def line_incidence(model):
+    lines_out = {n: [] for n in model.V}
+    lines_in = {n: [] for n in model.V}
+    for n, k in model.LINES:
+        lines_out[n].append((n, k))
+        lines_in[k].append((n, k))
+    return lines_out, lines_in
+
+
+model.LINES_OUT = Set(
+    model.V, dimen=2, within=model.LINES, initialize=lambda m: line_incidence(m)[0]
+)
+model.LINES_IN = Set(
+    model.V, dimen=2, within=model.LINES, initialize=lambda m: line_incidence(m)[1]
+)
+
+# Technical parameters
+model.pgmin = Param(model.G)
+model.pgmax = Param(model.G)
+model.ru = Param(model.G)
+model.rd = Param(model.G)
+model.pg0 = Param(model.G)
+model.u0 = Param(model.G)
+
+# Bids
+model.lbG = Param(model.G, model.bG, model.T, default=0)
+model.pbG = Param(model.G, model.bG, model.T, default=0)
+model.lbD = Param(model.D, model.bD, model.T, default=0)
+model.pbD = Param(model.D, model.bD, model.T, default=0)
+
+
+# Variables
+model.P_G = Var(model.G, model.bG, model.T, domain=NonNegativeReals)
+model.P_D = Var(model.D, model.bD, model.T, domain=NonNegativeReals)
+model.Theta = Var(model.V, model.T, domain=Reals)
+model.U = Var(model.G, model.T, domain=Binary)
+model.Flow = Var(model.LINES, model.T, domain=Reals)
+
+# Auxiliary expressions
+model.pg_total = Expression(
+    model.G, model.T, rule=lambda m, g, t: sum(m.P_G[g, b, t] for b in m.bG)
+)
+model.pd_total = Expression(
+    model.D, model.T, rule=lambda m, d, t: sum(m.P_D[d, b, t] for b in m.bD)
+)
+
+
+# Net injection of every bus
+def Injection(model, n, t):
+    generation = (
+        sum(model.pg_total[g, t] for g in model.GB[n]) if n in model.GB else 0
+    )
+    demand = sum(model.pd_total[d, t] for d in model.DB[n]) if n in model.DB else 0
+    return generation - demand
+
+
+model.Injection = Expression(model.V, model.T, rule=Injection)
+
+
+# Objective function - Maximize Social Welfare
+def Social_Welfare(model):
+    return sum(
+        model.lbD[d, b, t] * model.P_D[d, b, t]
+        for t in model.T
+        for d in model.D
+        for b in model.bD
+    ) - sum(
+        model.lbG[g, b, t] * model.P_G[g, b, t]
+        for t in model.T
+        for g in model.G
+        for b in model.bG
+    )
+
+
+model.obj = Objective(rule=Social_Welfare, sense=maximize)
+
+
+# Offer limits
+def Limit_G(model, g, b, t):
+    return model.P_G[g, b, t] <= model.pbG[g, b, t]
+
+
+def Limit_D(model, d, b, t):
+    return model.P_D[d, b, t] <= model.pbD[d, b, t]
+
+
+model.Limit_G = Constraint(model.G, model.bG, model.T, rule=Limit_G)
+model.Limit_D = Constraint(model.D, model.bD, model.T, rule=Limit_D)
+
+
+# Physical limits
+def Gen_Physical_Max(model, g, t):
+    return model.pg_total[g, t] <= model.pgmax[g] * model.U[g, t]
+
+
+def Gen_Physical_Min(model, g, t):
+    return model.pg_total[g, t] >= model.pgmin[g] * model.U[g, t]
+
+
+model.Gen_Physical_Max = Constraint(model.G, model.T, rule=Gen_Physical_Max)
+model.Gen_Physical_Min = Constraint(model.G, model.T, rule=Gen_Physical_Min)
+
+
+# Ramps
+def Ramp_Up(model, g, t):
+    if t == model.T.first():
+        return model.pg_total[g, t] - model.pg0[g] <= model.ru[g]
+    else:
+        return model.pg_total[g, t] - model.pg_total[g, t - 1] <= model.ru[g]
+
+
+def Ramp_Down(model, g, t):
+    if t == model.T.first():
+        return model.pg0[g] - model.pg_total[g, t] <= model.rd[g]
+    else:
+        return model.pg_total[g, t - 1] - model.pg_total[g, t] <= model.rd[g]
+
+
+model.Ramp_Up = Constraint(model.G, model.T, rule=Ramp_Up)
+model.Ramp_Down = Constraint(model.G, model.T, rule=Ramp_Down)
+
+
+# MPA constraints
+def System_Balance(model, t):
+    return (
+        sum(model.pg_total[g, t] for g in model.G)
+        - sum(model.pd_total[d, t] for d in model.D)
+        == 0
+    )
+
+
+model.System_Balance = Constraint(model.T, rule=System_Balance)
+
+
+# TCMPA constraints
+def DC_Flow_Eq(model, n, k, t):
+    return model.Flow[n, k, t] == model.Bsusc[n, k] * (
+        model.Theta[n, t] - model.Theta[k, t]
+    )
+
+
+def Node_Balance(model, n, t):
+    return model.Injection[n, t] == sum(
+        model.Flow[l, t] for l in model.LINES_OUT[n]
+    ) - sum(model.Flow[l, t] for l in model.LINES_IN[n])
+
+
+def Line_Capacity_Max(model, n, k, t):
+    return model.Flow[n, k, t] <= model.smax[n, k]
+
+
+def Line_Capacity_Min(model, n, k, t):
+    return model.Flow[n, k, t] >= -model.smax[n, k]
+
+
+def Ref_Bus_Angle(model, r, t):
+    return model.Theta[r, t] == 0
+
+
+model.DC_Flow_Eq = Constraint(model.LINES, model.T, rule=DC_Flow_Eq)
+model.Node_Balance = Constraint(model.V, model.T, rule=Node_Balance)
+model.Line_Capacity_Max = Constraint(model.LINES, model.T, rule=Line_Capacity_Max)
+model.Line_Capacity_Min = Constraint(model.LINES, model.T, rule=Line_Capacity_Min)
+model.Ref_Bus_Angle = Constraint(model.refB, model.T, rule=Ref_Bus_Angle)
+
+
+# TCMPA_PTDF constraints: the flows are PTDF-weighted sums of the
+# injections, and the limits of the lines are added lazily (see network.py)
+model.Line_Limits = ConstraintList()
+
+
+# Heuristic constraints, added per excluded generator
+model.Heuristic_Constraint = ConstraintList()
+
+
+def heuristic_cut_rhs(instance: ConcreteModel, g, t) -> int:
+    """
+    Upper bound of U[g, t] once g is excluded: an excluded
+    generator may only stay committed in the first period,
+    if it was already running
+    """
+    return 1 if (t == instance.T.first() and value(instance.pg0[g]) > 0) else 0
+
+
+# Constraints of the problems
+PROBLEMS = {
+    "MPA": ["System_Balance"],
+    "TCMPA": [
+        "DC_Flow_Eq",
+        "Node_Balance",
+        "Line_Capacity_Max",
+        "Line_Capacity_Min",
+        "Ref_Bus_Angle",
+    ],
+    "TCMPA_PTDF": ["System_Balance", "Line_Limits"],
+}
+
+
+def select_problem(instance: ConcreteModel, problem: str):
+    """
+    Activate the balance (MPA) or network (TCMPA, TCMPA_PTDF)
+    constraints of the problem, and deactivate those of the others
+    """
+    for constraints in PROBLEMS.values():
+        for constraint in constraints:
+            getattr(instance, constraint).deactivate()
+    for constraint in PROBLEMS[problem]:
+        getattr(instance, constraint).activate()
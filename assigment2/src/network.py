@@ -0,0 +1,138 @@
+"""
+This module contains the PTDF (Power Transfer Distribution
+Factors) network of the TCMPA_PTDF problem of models/mic.py.
+
+In the DC approximation, the flows of the lines are linear
+in the nodal injections: Flow = PTDF @ Injection, where,
+with A the line-bus incidence matrix and b the susceptances,
+    PTDF = diag(b) A_r (A_r^T diag(b) A_r)^-1
+without the column of the reference bus. The PTDF matrix is
+computed once, from a sparse LU factorization of the reduced
+susceptance matrix, and replaces the Theta and Flow variables
+and the DC_Flow_Eq constraints.
+
+The line limits are added lazily: the problem is solved
+without them, and only the limits of the lines found
+overloaded are added to Line_Limits, until none is.
+"""
+from typing import Optional
+
+import numpy as np
+from pyomo.environ import ConcreteModel, value
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import splu
+
+
+def ptdf_matrix(
+    lines: list, buses: list, susceptance: np.ndarray, ref_bus
+) -> np.ndarray:
+    """
+    (lines, buses) PTDF matrix of the grid, with a zero
+    column for the reference bus
+    """
+    n_lines, n_buses = len(lines), len(buses)
+    bus_index = {n: i for i, n in enumerate(buses)}
+    rows = np.repeat(np.arange(n_lines), 2)
+    cols = np.array([bus_index[n] for line in lines for n in line])
+    signs = np.tile([1.0, -1.0], n_lines)
+    incidence = coo_matrix((signs, (rows, cols)), shape=(n_lines, n_buses)).tocsc()
+
+    keep = np.array([n != ref_bus for n in buses])
+    incidence_r = incidence[:, keep]
+    weighted = incidence_r.T.multiply(susceptance).tocsc()  # A_r^T diag(b)
+    lu = splu((weighted @ incidence_r).tocsc())
+
+    ptdf = np.zeros((n_lines, n_buses))
+    ptdf[:, keep] = lu.solve(weighted.toarray()).T
+    return ptdf
+
+
+class PTDFNetwork:
+    """
+    The PTDF matrix of the grid of an instance, and the
+    line limits which have been added to its Line_Limits
+    """
+
+    def __init__(self, instance: ConcreteModel, threshold: float = 1e-8):
+        self.lines = list(instance.LINES)
+        self.buses = list(instance.V)
+        self.periods = list(instance.T)
+        self.smax = np.array([value(instance.smax[line]) for line in self.lines])
+        susceptance = np.array([value(instance.Bsusc[line]) for line in self.lines])
+
+        ptdf = ptdf_matrix(
+            self.lines, self.buses, susceptance, instance.refB.first()
+        )
+        ptdf[np.abs(ptdf) < threshold] = 0.0
+        self.ptdf = ptdf
+
+        # Only the buses with generators or demands inject power
+        self.injecting = [
+            i
+            for i, n in enumerate(self.buses)
+            if n in instance.GB or n in instance.DB
+        ]
+        self.limits = []  # (constraint, line index, period, direction)
+
+    def reset(self, instance: ConcreteModel):
+        instance.Line_Limits.clear()
+        self.limits = []
+
+    def injections(self, instance: ConcreteModel) -> np.ndarray:
+        """
+        (buses, periods) nodal injections of the current solution
+        """
+        inj = np.zeros((len(self.buses), len(self.periods)))
+        for i in self.injecting:
+            for j, t in enumerate(self.periods):
+                inj[i, j] = value(instance.Injection[self.buses[i], t])
+        return inj
+
+    def flows(self, instance: ConcreteModel) -> np.ndarray:
+        """
+        (lines, periods) flows of the current solution
+        """
+        return self.ptdf @ self.injections(instance)
+
+    def add_violated_limits(self, instance: ConcreteModel, tol: float = 1e-6) -> int:
+        """
+        Add the limits of the overloaded lines (per period and
+        direction) to Line_Limits, and return how many were added
+        """
+        flows = self.flows(instance)
+        overloaded = np.argwhere(np.abs(flows) > self.smax[:, None] + tol)
+
+        for l, j in overloaded:
+            direction = 1.0 if flows[l, j] > 0 else -1.0
+            t = self.periods[j]
+            flow = sum(
+                self.ptdf[l, i] * instance.Injection[self.buses[i], t]
+                for i in self.injecting
+                if self.ptdf[l, i] != 0
+            )
+            con = instance.Line_Limits.add(direction * flow <= self.smax[l])
+            self.limits.append((con, l, t, direction))
+
+        return len(overloaded)
+
+    def nodal_prices(
+        self, instance: ConcreteModel, duals: dict, buses: Optional[list] = None
+    ) -> dict:
+        """
+        Price of every bus and period, from the duals of the system
+        balance and of the line limits: the Node_Balance dual of
+        the formulation with angles
+        """
+        mu = np.zeros((len(self.lines), len(self.periods)))
+        period_index = {t: j for j, t in enumerate(self.periods)}
+        for con, l, t, direction in self.limits:
+            mu[l, period_index[t]] += direction * duals[con]
+
+        congestion = self.ptdf.T @ mu
+        buses = self.buses if buses is None else buses
+        bus_index = {n: i for i, n in enumerate(self.buses)}
+        return {
+            (n, t): duals[instance.System_Balance[t]] + congestion[bus_index[n], j]
+            for n in buses
+            for j, t in enumerate(self.periods)
+        }
@@ -0,0 +1,176 @@
+"""
+This module contains a parallel screening variant of the
+MIC heuristic of mic.py. Instead of excluding every
+violating generator at once, every iteration clears the
+market for several candidate exclusion sets, added to the
+generators already excluded:
+    - every violating generator alone
+    - the k violating generators with the largest losses,
+      for k = 2, ..., all of them (the last one is the
+      exclusion of report.run)
+The candidates are cleared in parallel worker processes,
+each with its own copy of the instance, and the best
+welfare MIC-feasible candidate (no eligible generator
+violates its MIC) ends the heuristic. When none is, the
+best welfare candidate is kept and the screening goes on.
+
+Every candidate is cleared from scratch (own solver models,
+no inherited line limits), and the results are collected in
+candidate order, so that the outcome does not depend on the
+number of workers or on their schedule.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+from instances.load import DATA_DIR, DATA_FILE, build_instance
+from mic import clear_market, exclude_generator, mic_violations, unfix_commitment
+from models.mic import model, select_problem
+from network import PTDFNetwork
+
+# Instance and problem of a worker process
+_INSTANCE = None
+_PROBLEM = None
+_NETWORK = None
+
+
+class ScreeningResult(NamedTuple):
+    excluded: list
+    converged: bool
+    welfare: float
+    unconstrained_welfare: float
+    finances: dict
+    wall_time: float
+    history: list[dict]
+
+
+def _init_worker(problem: str, data_dir: str, data_file: str, cache: Optional[str]):
+    global _INSTANCE, _PROBLEM, _NETWORK
+    _INSTANCE = build_instance(model, data_dir, data_file, cache=cache)
+    _PROBLEM = problem
+    select_problem(_INSTANCE, problem)
+    _NETWORK = PTDFNetwork(_INSTANCE) if problem == "TCMPA_PTDF" else None
+
+
+def _clearing_task(task: tuple) -> dict:
+    excluded, epsilon = task
+
+    _INSTANCE.Heuristic_Constraint.clear()
+    if _NETWORK is not None:
+        _NETWORK.reset(_INSTANCE)
+    for g in excluded:
+        exclude_generator(_INSTANCE, g)
+
+    clearing = clear_market(_INSTANCE, _PROBLEM, network=_NETWORK)
+    unfix_commitment(_INSTANCE)
+
+    eligible = [g for g in _INSTANCE.G if g not in excluded]
+    violations = mic_violations(clearing.finances, eligible, epsilon)
+    return {
+        "Excluded": excluded,
+        "Welfare": clearing.welfare,
+        "Losses": {
+            g: clearing.finances[g]["Cost"] - clearing.finances[g]["Revenue"]
+            for g in violations
+        },
+        "Finances": clearing.finances,
+    }
+
+
+def candidate_exclusions(excluded: tuple, losses: dict) -> list[tuple]:
+    """
+    Candidate exclusion sets: every violating generator alone,
+    and the violating generators ranked by loss, as prefixes
+    """
+    ranked = sorted(losses, key=lambda g: -losses[g])
+    candidates = [excluded + (g,) for g in ranked]
+    candidates += [excluded + tuple(ranked[:k]) for k in range(2, len(ranked) + 1)]
+    return candidates
+
+
+def screen_mic(
+    problem: str,
+    max_iter: int = 20,
+    epsilon: float = 1e-3,
+    max_workers: Optional[int] = None,
+    data_dir: str = DATA_DIR,
+    data_file: str = DATA_FILE,
+    cache: Optional[str] = None,
+    verbose: bool = True,
+) -> ScreeningResult:
+    """
+    Run the parallel MIC screening on problem ("MPA", "TCMPA" or
+    "TCMPA_PTDF"). With max_workers = 1 the candidates are cleared
+    in this process. The history holds, per iteration (the first
+    one is the unconstrained clearing), the number of candidates,
+    the welfare and exclusions of the kept one, and the elapsed time.
+    """
+    init_args = (problem, data_dir, data_file, cache)
+    if max_workers == 1:
+        _init_worker(*init_args)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=init_args
+        )
+
+    def clear_all(candidates):
+        tasks = [(excluded, epsilon) for excluded in candidates]
+        if executor is None:
+            return [_clearing_task(task) for task in tasks]
+        return list(executor.map(_clearing_task, tasks))
+
+    tic = time.perf_counter()
+    history = []
+
+    def record(iteration, n_candidates, n_feasible, best):
+        history.append(
+            {
+                "Iteration": iteration,
+                "Candidates": n_candidates,
+                "Feasible": n_feasible,
+                "Welfare": best["Welfare"],
+                "Excluded": list(best["Excluded"]),
+                "Time": time.perf_counter() - tic,
+            }
+        )
+        if verbose:
+            print(
+                f"{iteration:>4} | {n_candidates} candidates "
+                f"({n_feasible} feasible) | Welfare {best['Welfare']:.2f} | "
+                f"Excluded {', '.join(best['Excluded']) or '-'} | "
+                f"{history[-1]['Time']:.2f}s"
+            )
+
+    try:
+        # Unconstrained clearing
+        best = clear_all([()])[0]
+        unconstrained_welfare = best["Welfare"]
+        converged = not best["Losses"]
+        record(1, 1, int(converged), best)
+
+        for iteration in range(2, max_iter + 1):
+            if converged:
+                break
+
+            candidates = candidate_exclusions(best["Excluded"], best["Losses"])
+            outcomes = clear_all(candidates)
+
+            feasible = [outcome for outcome in outcomes if not outcome["Losses"]]
+            converged = bool(feasible)
+            # max keeps the first of equal welfares, i.e. the candidate order
+            best = max(feasible or outcomes, key=lambda outcome: outcome["Welfare"])
+            record(iteration, len(candidates), len(feasible), best)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return ScreeningResult(
+        excluded=list(best["Excluded"]),
+        converged=converged,
+        welfare=best["Welfare"],
+        unconstrained_welfare=unconstrained_welfare,
+        finances=best["Finances"],
+        wall_time=time.perf_counter() - tic,
+        history=history,
+    )
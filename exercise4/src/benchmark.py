@@ -0,0 +1,119 @@
+"""
+This module contains the benchmark of the commitment
+formulations of the multi-period auction (big_m, tight and
+tight_big_m, see models/multi_period_auction.py) on scaled-up synthetic
+instances (instances/generate.py). For every formulation,
+generator count and period count, it records:
+    - build: Pyomo construction of the instance
+    - lp: solve of the LP relaxation (u in [0, 1]) and its bound,
+      including the load of the instance into HiGHS
+    - mip: HiGHS branch-and-bound, its node count and welfare
+    - root gap: (LP bound - MIP welfare) / MIP welfare
+big_m does not have the same feasible region (it leaves P_min
+unenforced), so its welfare differs too. tight_big_m has the
+feasible region of tight with a big-M capacity limit: their
+difference is the strength of the LP relaxation only.
+
+Usage (from exercise4/src):
+    python benchmark.py --generators 50 100 --periods 24 48 --output bench
+writes bench.json and bench.csv.
+"""
+import argparse
+import json
+import time
+from itertools import product
+
+import pandas as pd
+from pyomo.contrib.solver.solvers.highs import Highs
+from pyomo.environ import Binary, UnitInterval
+
+from instances.generate import build_instance, generate_data
+from models.multi_period_auction import FORMULATIONS, model
+
+
+def run_case(
+    formulation: str,
+    n_generators: int,
+    n_periods: int,
+    n_demands: int,
+    time_limit: float,
+    seed: int,
+) -> dict:
+    data = generate_data(n_generators, n_demands, n_periods, seed=seed)
+
+    t = time.perf_counter()
+    instance = build_instance(model, data, formulation)
+    build_time = time.perf_counter() - t
+
+    solver = Highs()
+    solver.config.time_limit = time_limit
+    solver.config.raise_exception_on_nonoptimal_result = False
+    solver.config.load_solutions = False
+
+    # LP relaxation
+    instance.u.domain = UnitInterval
+    t = time.perf_counter()
+    lp = solver.solve(instance)
+    lp_time = time.perf_counter() - t
+
+    instance.u.domain = Binary
+    t = time.perf_counter()
+    mip = solver.solve(instance)
+    mip_time = time.perf_counter() - t
+
+    lp_bound = lp.incumbent_objective
+    welfare = mip.incumbent_objective
+    root_gap = None
+    if lp_bound is not None and welfare:
+        root_gap = (lp_bound - welfare) / abs(welfare)
+
+    return {
+        "formulation": formulation,
+        "n_generators": n_generators,
+        "n_periods": n_periods,
+        "build_s": build_time,
+        "lp_s": lp_time,
+        "mip_s": mip_time,
+        "nodes": mip.extra_info.mip_node_count,
+        "lp_bound": lp_bound,
+        "welfare": welfare,
+        "mip_bound": mip.objective_bound,
+        "root_gap": root_gap,
+        "termination": mip.termination_condition.name,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-period auction formulation benchmark")
+    parser.add_argument("--formulations", nargs="+", choices=FORMULATIONS, default=FORMULATIONS)
+    parser.add_argument("--generators", nargs="+", type=int, default=[20, 50, 100])
+    parser.add_argument("--periods", nargs="+", type=int, default=[24, 48])
+    parser.add_argument("--demands", type=int, default=5)
+    parser.add_argument("--time-limit", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="benchmark")
+    args = parser.parse_args()
+
+    results = []
+    for n_generators, n_periods, formulation in product(
+        args.generators, args.periods, args.formulations
+    ):
+        row = run_case(
+            formulation, n_generators, n_periods, args.demands, args.time_limit, args.seed
+        )
+        gap = "-" if row["root_gap"] is None else f"{100 * row['root_gap']:.4f}%"
+        print(
+            f"{row['formulation']:<11} | G={row['n_generators']:<4} | T={row['n_periods']:<4} | "
+            f"build {row['build_s']:.2f}s | LP {row['lp_s']:.2f}s | MIP {row['mip_s']:.2f}s | "
+            f"{row['nodes']} nodes | root gap {gap} | welfare {row['welfare']:.2f} | "
+            f"{row['termination']}"
+        )
+        results.append(row)
+
+    with open(f"{args.output}.json", "w") as f:
+        json.dump({"results": results}, f, indent=2)
+    pd.DataFrame(results).to_csv(f"{args.output}.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+This module contains a generator of synthetic multi-period
+auction instances, scaled up from data_all.dat, for the
+benchmarks of the multi-period model:
+    - generators with capacities P_max, minimum outputs P_min
+      and ramps R_up / R_dn in proportion of P_max, bidding
+      their capacity in blocks of increasing price
+    - demands following a daily profile, bidding in blocks of
+      decreasing price, down to a low-priced tail which keeps
+      the must-run generation of the committed units tradable
+The data is a dict of component values for create_instance.
+"""
+from typing import Optional
+
+import numpy as np
+from pyomo.environ import AbstractModel, ConcreteModel
+
+
+def generate_data(
+    n_generators: int,
+    n_demands: int,
+    n_periods: int,
+    n_blocks: int = 3,
+    seed: int = 1234,
+) -> dict:
+    """
+    Component values of a random instance with n_generators,
+    n_demands and n_periods, and n_blocks bid blocks per agent
+    """
+    rng = np.random.default_rng(seed)
+    G = list(range(1, n_generators + 1))
+    D = list(range(1, n_demands + 1))
+    T = list(range(1, n_periods + 1))
+    B = list(range(1, n_blocks + 1))
+
+    p_max = rng.uniform(50, 300, n_generators).round()
+    p_min = (p_max * rng.uniform(0.2, 0.5, n_generators)).round()
+    ramp = (p_max * rng.uniform(0.2, 0.6, n_generators)).round()
+    u_0 = (rng.random(n_generators) < 0.6).astype(int)
+    p_0 = np.where(u_0 == 1, rng.uniform(p_min, p_max), 0).round()
+
+    # Supply blocks: equal shares of P_max, at increasing prices
+    cost = rng.uniform(10, 60, (n_generators, 1, 1))
+    steps = np.cumsum(rng.uniform(0, 10, (n_generators, n_periods, n_blocks)), axis=-1)
+    q_g = np.broadcast_to(p_max[:, None, None] / n_blocks, steps.shape)
+    lambda_g = (cost + steps).round(2)
+
+    # Demand blocks: a daily profile of total demand, with a low-priced tail block
+    profile = 0.75 + 0.2 * np.sin(2 * np.pi * (np.array(T) - 8) / 24)
+    share = rng.dirichlet(np.ones(n_demands))
+    peak = p_max.sum() * profile[None, :] * share[:, None]
+    split = rng.dirichlet(np.ones(n_blocks), (n_demands, n_periods))
+    q_d = (peak[:, :, None] * split).round(2)
+    q_d[:, :, -1] += (p_min.sum() * share)[:, None].round(2)
+    lambda_d = np.sort(rng.uniform(40, 120, (n_demands, n_periods, n_blocks)), axis=-1)[
+        :, :, ::-1
+    ].round(2)
+    lambda_d[:, :, -1] = 1.0
+
+    def indexed(agents, values):
+        return {
+            (a, t, k): float(values[i, j, l])
+            for i, a in enumerate(agents)
+            for j, t in enumerate(T)
+            for l, k in enumerate(B)
+        }
+
+    return {
+        None: {
+            "T": {None: T},
+            "G": {None: G},
+            "D": {None: D},
+            "B_G": {None: B},
+            "B_D": {None: B},
+            "P_max": dict(zip(G, p_max.tolist())),
+            "P_min": dict(zip(G, p_min.tolist())),
+            "R_up": dict(zip(G, ramp.tolist())),
+            "R_dn": dict(zip(G, ramp.tolist())),
+            "P_0": dict(zip(G, p_0.tolist())),
+            "U_0": dict(zip(G, u_0.tolist())),
+            "P_B_G": indexed(G, q_g),
+            "Lambda_B_G": indexed(G, lambda_g),
+            "P_B_D": indexed(D, q_d),
+            "Lambda_B_D": indexed(D, lambda_d),
+        }
+    }
+
+
+def build_instance(
+    abstract_model: AbstractModel, data: dict, formulation: Optional[str] = None
+) -> ConcreteModel:
+    """
+    Instance of the multi-period model from the data of
+    generate_data, with the given commitment formulation
+    (see FORMULATIONS, default: the model default)
+    """
+    if formulation is not None:
+        data = {None: {**data[None], "formulation": {None: formulation}}}
+    return abstract_model.create_instance(data)
@@ -1,25 +1,46 @@
+import argparse
 
 from pyomo.environ import SolverFactory, TerminationCondition, value
 
 from models.single_period_auction import model as model_single_period
 from models.multi_period_auction import model as model_multi_period
+from solvers.merit_order import clear_markets, stack_auctions
 
-from plots import plot_single_period_auction, plot_multiperiod_auction
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single and multi-period market clearing")
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="do not plot the market clearings (matplotlib is not imported)",
+    )
+    args = parser.parse_args()
 
-import matplotlib.pyplot as plt
+    if not args.no_plot:
+        from plots import plot_single_period_auction, plot_multiperiod_auction
+
+        import matplotlib.pyplot as plt
 
-if __name__ == "__main__":
     solver = SolverFactory('highs')
 
     instance_t1 = model_single_period.create_instance('exercise4/src/instances/data_t1.dat')
+    instance_t2 = model_single_period.create_instance('exercise4/src/instances/data_t2.dat')
+
+    # Both periods cleared at once by merit order
+    markets = clear_markets(*stack_auctions([instance_t1, instance_t2]))
+
     results_t1 = solver.solve(instance_t1, tee=True)
     if results_t1.solver.termination_condition == TerminationCondition.optimal:
-        fig1, ax1 = plot_single_period_auction(instance_t1)
-        plt.savefig('exercise4/src/img/market_clearing_t1.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        if not args.no_plot:
+            fig1, ax1 = plot_single_period_auction(instance_t1)
+            plt.savefig('exercise4/src/img/market_clearing_t1.png', dpi=300, bbox_inches='tight')
+            plt.show()
 
         print("\n=== PERIOD t=1 RESULTS ===")
         print(f"Social Welfare: {value(instance_t1.obj)}")
+        print(
+            f"Merit-order clearing: Social Welfare={markets.welfare[0]} | "
+            f"Price={markets.price[0]} | Volume={markets.volume[0]} MW"
+        )
         
         for i in instance_t1.G:
             total_gen = 0
@@ -40,15 +61,19 @@ if __name__ == "__main__":
     
     print("\n" + "="*50 + "\n")
     
-    instance_t2 = model_single_period.create_instance('exercise4/src/instances/data_t2.dat')
     results_t2 = solver.solve(instance_t2, tee=True)    
     if results_t2.solver.termination_condition == TerminationCondition.optimal:
-        fig1, ax1 = plot_single_period_auction(instance_t2)
-        plt.savefig('exercise4/src/img/market_clearing_t2.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        if not args.no_plot:
+            fig1, ax1 = plot_single_period_auction(instance_t2)
+            plt.savefig('exercise4/src/img/market_clearing_t2.png', dpi=300, bbox_inches='tight')
+            plt.show()
         
         print("\n=== PERIOD t=2 RESULTS ===")
         print(f"Social Welfare: {value(instance_t2.obj)}")
+        print(
+            f"Merit-order clearing: Social Welfare={markets.welfare[1]} | "
+            f"Price={markets.price[1]} | Volume={markets.volume[1]} MW"
+        )
         
         for i in instance_t2.G:
             print(f"Generator {i} ===")
@@ -74,9 +99,10 @@ if __name__ == "__main__":
     results = solver.solve(instance, tee=True)
     
     if results.solver.termination_condition == TerminationCondition.optimal:
-        fig2, axes2 = plot_multiperiod_auction(instance)
-        plt.savefig('exercise4/src/img/multiperiod_auction.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        if not args.no_plot:
+            fig2, axes2 = plot_multiperiod_auction(instance)
+            plt.savefig('exercise4/src/img/multiperiod_auction.png', dpi=300, bbox_inches='tight')
+            plt.show()
 
         print("\n" + "="*60)
         print("=== MULTI-PERIOD MARKET CLEARING RESULTS ===")
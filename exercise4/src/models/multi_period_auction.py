@@ -45,6 +45,14 @@ model.Lambda_B_D = Param(model.D, model.T, model.B_D)
 
 model.delta_t = Param(default=1.0)
 
+# Commitment formulation:
+#   - big_m: P_G_total <= M * u, and ramps which ignore u (P_min and P_max unused)
+#   - tight: P_min * u <= P_G_total <= P_max * u, and startup/shutdown-aware ramps
+#   - tight_big_m: the feasible region of tight, with P_G_total <= M * u and
+#     P_G_total <= P_max instead of P_max * u (its weaker LP relaxation only)
+FORMULATIONS = ["big_m", "tight", "tight_big_m"]
+model.formulation = Param(within=FORMULATIONS, default="big_m")
+
 # Variables
 model.P_G = Var(
     model.G, model.T, model.B_G, domain=NonNegativeReals
@@ -102,7 +110,14 @@ def Market_Equilibrium(model, t):
     )
 
 
+def commits_units(model):
+    # Formulations with P_min and startup/shutdown-aware ramps
+    return model.formulation.value in ("tight", "tight_big_m")
+
+
 def Ramp_Up_Limit(model, i, t):
+    if commits_units(model):
+        return Constraint.Skip
     if t == model.T.first():
         return model.P_G_total[i, t] - model.P_0[i] <= model.R_up[i]
     else:
@@ -111,6 +126,8 @@ def Ramp_Up_Limit(model, i, t):
 
 
 def Ramp_Down_Limit(model, i, t):
+    if commits_units(model):
+        return Constraint.Skip
     if t == model.T.first():
         return model.P_G_total[i, t] - model.P_0[i] >= -model.R_dn[i]
     else:
@@ -119,13 +136,53 @@ def Ramp_Down_Limit(model, i, t):
 
 
 def Generation_Min_Limit(model, i, t):
+    if commits_units(model):
+        return model.P_G_total[i, t] >= model.P_min[i] * model.u[i, t]
     return model.P_G_total[i, t] >= 0
 
 
 def Generation_Max_Limit(model, i, t):
+    if model.formulation.value == "tight":
+        return model.P_G_total[i, t] <= model.P_max[i] * model.u[i, t]
     return model.P_G_total[i, t] <= model.M * model.u[i, t]
 
 
+def Generation_Capacity(model, i, t):
+    if model.formulation.value != "tight_big_m":
+        return Constraint.Skip
+    return model.P_G_total[i, t] <= model.P_max[i]
+
+
+def previous_state(model, i, t):
+    # Generation and commitment of unit i before period t
+    if t == model.T.first():
+        return model.P_0[i], model.U_0[i]
+    t_prev = model.T.prev(t)
+    return model.P_G_total[i, t_prev], model.u[i, t_prev]
+
+
+def Ramp_Up_Tight(model, i, t):
+    # Ramp-up of an online unit, or up to its startup ramp when starting up
+    if not commits_units(model):
+        return Constraint.Skip
+    p_prev, u_prev = previous_state(model, i, t)
+    startup = max(value(model.R_up[i]), value(model.P_min[i]))
+    return model.P_G_total[i, t] - p_prev <= model.R_up[i] * u_prev + startup * (
+        model.u[i, t] - u_prev
+    )
+
+
+def Ramp_Down_Tight(model, i, t):
+    # Ramp-down of an online unit, or from its shutdown ramp when shutting down
+    if not commits_units(model):
+        return Constraint.Skip
+    p_prev, u_prev = previous_state(model, i, t)
+    shutdown = max(value(model.R_dn[i]), value(model.P_min[i]))
+    return p_prev - model.P_G_total[i, t] <= model.R_dn[i] * model.u[i, t] + shutdown * (
+        u_prev - model.u[i, t]
+    )
+
+
 model.matched_gen = Constraint(model.G, model.T, model.B_G, rule=Matched_Generation)
 model.matched_dem = Constraint(model.D, model.T, model.B_D, rule=Matched_Demand)
 model.total_gen = Constraint(model.G, model.T, rule=Total_Generation)
@@ -135,3 +192,6 @@ model.ramp_up = Constraint(model.G, model.T, rule=Ramp_Up_Limit)
 model.ramp_down = Constraint(model.G, model.T, rule=Ramp_Down_Limit)
 model.gen_min = Constraint(model.G, model.T, rule=Generation_Min_Limit)
 model.gen_max = Constraint(model.G, model.T, rule=Generation_Max_Limit)
+model.gen_cap = Constraint(model.G, model.T, rule=Generation_Capacity)
+model.ramp_up_tight = Constraint(model.G, model.T, rule=Ramp_Up_Tight)
+model.ramp_down_tight = Constraint(model.G, model.T, rule=Ramp_Down_Tight)
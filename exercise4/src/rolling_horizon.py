@@ -0,0 +1,226 @@
+"""
+This module contains a rolling-horizon clearing of the
+multi-period auction of models/multi_period_auction.py, for
+horizons too long to clear in one MIP. Windows of W periods
+are cleared in turn:
+    - the first K periods of every window are committed (all
+      of them in the last window, which reaches the horizon)
+    - the generation and commitment of the last committed
+      period are the P_0 and U_0 of the next window
+Every window is a MIP of W periods, so the clearing time
+grows linearly with the horizon. The welfare gap to the
+full-horizon MIP (when it can be solved) measures the loss
+of the myopic windows.
+
+Usage (from exercise4/src):
+    python rolling_horizon.py --periods 168 --window 24 --commit 12 --full
+"""
+import argparse
+import time
+from typing import NamedTuple, Optional
+
+from pyomo.contrib.solver.common.results import SolutionStatus
+from pyomo.contrib.solver.solvers.highs import Highs
+from pyomo.environ import ConcreteModel, value
+
+from instances.generate import build_instance, generate_data
+from models.multi_period_auction import FORMULATIONS, model
+
+# Parameters indexed by (agent, period, block)
+PERIOD_PARAMS = ["P_B_G", "Lambda_B_G", "P_B_D", "Lambda_B_D"]
+
+
+class RollingResult(NamedTuple):
+    welfare: float
+    schedule: dict  # P_G_total of the committed periods, by (generator, period)
+    commitment: dict  # u of the committed periods, by (generator, period)
+    wall_time: float
+    history: list[dict]
+
+
+class FullResult(NamedTuple):
+    welfare: float
+    bound: float
+    termination: str
+    wall_time: float
+
+
+def window_data(data: dict, periods: list, p_0: dict, u_0: dict) -> dict:
+    """
+    Data of the periods of a window, from the data of the whole
+    horizon (see instances.generate), with initial state p_0, u_0
+    """
+    full = data[None]
+    window = set(periods)
+    sliced = {
+        name: {index: v for index, v in full[name].items() if index[1] in window}
+        for name in PERIOD_PARAMS
+    }
+    return {None: {**full, **sliced, "T": {None: list(periods)}, "P_0": p_0, "U_0": u_0}}
+
+
+def period_welfare(instance: ConcreteModel, t) -> float:
+    """
+    Social welfare of period t of a solved instance
+    """
+    demand = sum(
+        value(instance.Lambda_B_D[d, t, k] * instance.P_D[d, t, k])
+        for d in instance.D
+        for k in instance.B_D
+    )
+    supply = sum(
+        value(instance.Lambda_B_G[i, t, k] * instance.P_G[i, t, k])
+        for i in instance.G
+        for k in instance.B_G
+    )
+    return (demand - supply) * value(instance.delta_t)
+
+
+def _solver(time_limit: Optional[float]) -> Highs:
+    solver = Highs()
+    solver.config.time_limit = time_limit
+    solver.config.raise_exception_on_nonoptimal_result = False
+    return solver
+
+
+def rolling_horizon(
+    data: dict,
+    window: int,
+    commit: int,
+    formulation: Optional[str] = None,
+    time_limit: Optional[float] = 60,
+    verbose: bool = True,
+) -> RollingResult:
+    """
+    Clear the horizon of data in windows of window periods,
+    committing commit periods per window. time_limit (in
+    seconds, None for no limit) applies to each window. The
+    history holds, per window, its periods, the committed
+    welfare, the node count and the solve time.
+    """
+    if not 1 <= commit <= window:
+        raise ValueError(f"commit must be in [1, window], got {commit}")
+
+    full = data[None]
+    horizon = list(full["T"][None])
+    p_0, u_0 = dict(full["P_0"]), dict(full["U_0"])
+
+    schedule, commitment, history = {}, {}, []
+    welfare = 0.0
+    tic = time.perf_counter()
+
+    first = 0
+    while first < len(horizon):
+        periods = horizon[first : first + window]
+        last_window = first + window >= len(horizon)
+        committed = periods if last_window else periods[:commit]
+
+        instance = build_instance(model, window_data(data, periods, p_0, u_0), formulation)
+        results = _solver(time_limit).solve(instance)
+        if results.solution_status not in (SolutionStatus.optimal, SolutionStatus.feasible):
+            raise RuntimeError(
+                f"No solution for periods {periods[0]}-{periods[-1]}: "
+                f"{results.termination_condition.name}"
+            )
+
+        window_welfare = 0.0
+        for t in committed:
+            window_welfare += period_welfare(instance, t)
+            for i in instance.G:
+                schedule[i, t] = value(instance.P_G_total[i, t])
+                commitment[i, t] = round(value(instance.u[i, t]))
+        welfare += window_welfare
+
+        t_last = committed[-1]
+        p_0 = {i: schedule[i, t_last] for i in instance.G}
+        u_0 = {i: commitment[i, t_last] for i in instance.G}
+
+        history.append(
+            {
+                "Periods": (periods[0], periods[-1]),
+                "Committed": len(committed),
+                "Welfare": window_welfare,
+                "Nodes": results.extra_info.mip_node_count,
+                "Time": results.timing_info.wall_time,
+                "Termination": results.termination_condition.name,
+            }
+        )
+        if verbose:
+            h = history[-1]
+            print(
+                f"T={h['Periods'][0]:>4}-{h['Periods'][1]:<4} | committed {h['Committed']:>3} | "
+                f"Welfare {h['Welfare']:.2f} | {h['Nodes']} nodes | {h['Time']:.2f}s | "
+                f"{h['Termination']}"
+            )
+
+        first += len(committed)
+
+    return RollingResult(
+        welfare=welfare,
+        schedule=schedule,
+        commitment=commitment,
+        wall_time=time.perf_counter() - tic,
+        history=history,
+    )
+
+
+def solve_full(
+    data: dict, formulation: Optional[str] = None, time_limit: Optional[float] = 600
+) -> FullResult:
+    """
+    Full-horizon MIP, for the welfare gap of the rolling horizon
+    (with the best bound when the time limit is reached)
+    """
+    tic = time.perf_counter()
+    instance = build_instance(model, data, formulation)
+    results = _solver(time_limit).solve(instance)
+    return FullResult(
+        welfare=results.incumbent_objective,
+        bound=results.objective_bound,
+        termination=results.termination_condition.name,
+        wall_time=time.perf_counter() - tic,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-horizon multi-period market clearing")
+    parser.add_argument("--generators", type=int, default=50)
+    parser.add_argument("--demands", type=int, default=5)
+    parser.add_argument("--periods", type=int, default=168)
+    parser.add_argument("--window", type=int, default=24)
+    parser.add_argument("--commit", type=int, default=12)
+    parser.add_argument("--formulation", choices=FORMULATIONS, default="tight")
+    parser.add_argument("--time-limit", type=float, default=60, help="per window, in seconds")
+    parser.add_argument(
+        "--full", action="store_true", help="also solve the full horizon for the welfare gap"
+    )
+    parser.add_argument("--full-time-limit", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    data = generate_data(args.generators, args.demands, args.periods, seed=args.seed)
+    result = rolling_horizon(
+        data,
+        args.window,
+        args.commit,
+        formulation=args.formulation,
+        time_limit=args.time_limit,
+    )
+    print(
+        f"\nRolling horizon: {len(result.history)} windows | "
+        f"Welfare {result.welfare:.2f} | Time {result.wall_time:.2f}s"
+    )
+
+    if args.full:
+        full = solve_full(data, args.formulation, args.full_time_limit)
+        print(
+            f"Full horizon: Welfare {full.welfare:.2f} | Bound {full.bound:.2f} | "
+            f"{full.termination} | Time {full.wall_time:.2f}s"
+        )
+        gap = (full.welfare - result.welfare) / abs(full.welfare)
+        bound_gap = (full.bound - result.welfare) / abs(full.bound)
+        print(f"Welfare gap: {100 * gap:.4f}% (to the bound: {100 * bound_gap:.4f}%)")
+
+
+if __name__ == "__main__":
+    main()
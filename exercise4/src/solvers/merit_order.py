@@ -0,0 +1,227 @@
+"""
+This module contains a direct merit-order clearing of the
+single-period block auction of models/single_period_auction.py
+(with its network and ramp constraints left out, as in the
+model): every block is only limited by its quantity, and
+supply meets demand in one market equilibrium, so the LP
+is solved by intersecting the supply and demand curves:
+    - the supply blocks are sorted by ascending price and the
+      demand blocks by descending price, and accumulated
+    - the union of both cumulative quantities splits the
+      traded volume into segments of constant supply and
+      demand prices, which are traded while the demand price
+      exceeds the supply price
+in O(B log B) for B blocks. The arrays of bids have shape
+(..., blocks), with any leading dimensions (periods, markets)
+cleared at once; clear_markets takes the bids of many markets
+stacked as (market, agent, block) tensors.
+"""
+from typing import NamedTuple
+
+import numpy as np
+from pyomo.environ import ConcreteModel, value
+
+
+class Clearing(NamedTuple):
+    P_G: np.ndarray  # Accepted supply quantities, (..., supply blocks)
+    P_D: np.ndarray  # Accepted demand quantities, (..., demand blocks)
+    volume: np.ndarray  # Traded volume, (...)
+    price: np.ndarray  # Marginal price, (...)
+    welfare: np.ndarray  # Social welfare, (...)
+
+
+def _curve(quantity: np.ndarray, price: np.ndarray, descending: bool):
+    # Merit order, sorted prices and cumulative quantities of a curve
+    order = np.argsort(-price if descending else price, axis=-1, kind="stable")
+    quantity = np.take_along_axis(quantity, order, axis=-1)
+    price = np.take_along_axis(price, order, axis=-1)
+    return order, quantity, price, np.cumsum(quantity, axis=-1)
+
+
+def _accepted(volume, order, quantity, cumulative) -> np.ndarray:
+    # Accepted quantity of every block, in the input order
+    sorted_accepted = np.clip(volume[..., None] - (cumulative - quantity), 0, quantity)
+    accepted = np.empty_like(sorted_accepted)
+    np.put_along_axis(accepted, order, sorted_accepted, axis=-1)
+    return accepted
+
+
+def _segment_price(prices: np.ndarray, index: np.ndarray, outside: float) -> np.ndarray:
+    # Price of the segments index, outside for no segment (-1 or past the end)
+    padded = np.concatenate([prices, np.full(prices.shape[:-1] + (1,), outside)], axis=-1)
+    index = np.where(index < 0, prices.shape[-1], index)
+    return np.take_along_axis(padded, index[..., None], axis=-1)[..., 0]
+
+
+def clear_merit_order(
+    q_g: np.ndarray, lambda_g: np.ndarray, q_d: np.ndarray, lambda_d: np.ndarray
+) -> Clearing:
+    """
+    Clear the auctions of supply blocks (quantities q_g, prices
+    lambda_g) and demand blocks (q_d, lambda_d), of shapes
+    (..., supply blocks) and (..., demand blocks).
+
+    The marginal price is the price of the partially accepted
+    block; when the volume falls between blocks, any price
+    between the last accepted and first rejected bids clears
+    the market, and the middle of that range is returned.
+    """
+    q_g, lambda_g, q_d, lambda_d = (
+        np.asarray(a, dtype=float) for a in (q_g, lambda_g, q_d, lambda_d)
+    )
+    n_g, n_d = q_g.shape[-1], q_d.shape[-1]
+
+    order_g, q_g_sorted, lambda_g_sorted, cum_g = _curve(q_g, lambda_g, False)
+    order_d, q_d_sorted, lambda_d_sorted, cum_d = _curve(q_d, lambda_d, True)
+
+    # Segments between the merged breakpoints of both curves
+    breakpoints = np.concatenate([cum_g, cum_d], axis=-1)
+    is_supply = np.broadcast_to(
+        np.r_[np.ones(n_g, dtype=int), np.zeros(n_d, dtype=int)], breakpoints.shape
+    )
+    merge = np.argsort(breakpoints, axis=-1, kind="stable")
+    breakpoints = np.take_along_axis(breakpoints, merge, axis=-1)
+    is_supply = np.take_along_axis(is_supply, merge, axis=-1)
+
+    lengths = np.diff(breakpoints, axis=-1, prepend=0.0)
+    # Blocks of each curve before every segment (exhausted: n_g or n_d)
+    block_g = np.cumsum(is_supply, axis=-1) - is_supply
+    block_d = np.cumsum(1 - is_supply, axis=-1) - (1 - is_supply)
+
+    pad = [(0, 0)] * (breakpoints.ndim - 1) + [(0, 1)]
+    price_g = np.take_along_axis(
+        np.pad(lambda_g_sorted, pad, constant_values=np.inf), block_g, axis=-1
+    )
+    price_d = np.take_along_axis(
+        np.pad(lambda_d_sorted, pad, constant_values=-np.inf), block_d, axis=-1
+    )
+
+    # Pd decreases and Ps increases: the traded segments are a prefix
+    traded = price_d > price_g
+    volume = np.sum(np.where(traded, lengths, 0.0), axis=-1)
+    welfare = np.sum(lengths * np.where(traded, price_d - price_g, 0.0), axis=-1)
+
+    # Price range between the last traded and the first untraded segment
+    # (zero-length segments are skipped)
+    n_segments = n_g + n_d
+    positive = lengths > 0
+    last = np.max(np.where(traded & positive, np.arange(n_segments), -1), axis=-1)
+    first_untraded = np.min(
+        np.where(~traded & positive, np.arange(n_segments), n_segments), axis=-1
+    )
+
+    low = np.maximum(
+        _segment_price(price_g, last, -np.inf),
+        _segment_price(price_d, first_untraded, -np.inf),
+    )
+    high = np.minimum(
+        _segment_price(price_d, last, np.inf),
+        _segment_price(price_g, first_untraded, np.inf),
+    )
+    with np.errstate(invalid="ignore"):
+        price = np.where(
+            np.isfinite(low) & np.isfinite(high),
+            (low + high) / 2,
+            np.where(np.isfinite(low), low, high),
+        )
+
+    return Clearing(
+        P_G=_accepted(volume, order_g, q_g_sorted, cum_g),
+        P_D=_accepted(volume, order_d, q_d_sorted, cum_d),
+        volume=volume,
+        price=price,
+        welfare=welfare,
+    )
+
+
+def auction_arrays(instance: ConcreteModel) -> tuple:
+    """
+    Bids of a single-period auction instance, flattened over
+    (agent, block) in the order of the instance sets
+    """
+    supply = [(i, k) for i in instance.G for k in instance.B_G]
+    demand = [(d, k) for d in instance.D for k in instance.B_D]
+    return (
+        np.array([value(instance.P_B_G[i, k]) for i, k in supply]),
+        np.array([value(instance.Lambda_B_G[i, k]) for i, k in supply]),
+        np.array([value(instance.P_B_D[d, k]) for d, k in demand]),
+        np.array([value(instance.Lambda_B_D[d, k]) for d, k in demand]),
+    )
+
+
+def clear_instance(instance: ConcreteModel) -> Clearing:
+    """
+    Merit-order clearing of a single-period auction instance,
+    which also loads the accepted quantities into P_G and P_D
+    """
+    clearing = clear_merit_order(*auction_arrays(instance))
+
+    supply = [(i, k) for i in instance.G for k in instance.B_G]
+    demand = [(d, k) for d in instance.D for k in instance.B_D]
+    for (i, k), p in zip(supply, clearing.P_G):
+        instance.P_G[i, k].set_value(float(p))
+    for (d, k), p in zip(demand, clearing.P_D):
+        instance.P_D[d, k].set_value(float(p))
+
+    return clearing
+
+
+class MarketClearing(NamedTuple):
+    P_G: np.ndarray  # Accepted supply quantities, (market, generator, block)
+    P_D: np.ndarray  # Accepted demand quantities, (market, demand, block)
+    volume: np.ndarray  # Traded volume, (market,)
+    price: np.ndarray  # Marginal price, (market,)
+    welfare: np.ndarray  # Social welfare, (market,)
+
+
+def clear_markets(
+    q_g: np.ndarray, lambda_g: np.ndarray, q_d: np.ndarray, lambda_d: np.ndarray
+) -> MarketClearing:
+    """
+    Clear many single-period auctions in one pass, from the
+    stacked bids of shape (market, generator, block) and
+    (market, demand, block). All the markets must have the
+    same shape: callers may pad markets with fewer agents or
+    blocks with zero-quantity bids, which are never traded.
+    """
+    q_g, lambda_g, q_d, lambda_d = (
+        np.asarray(a, dtype=float) for a in (q_g, lambda_g, q_d, lambda_d)
+    )
+    n_markets = q_g.shape[0]
+    clearing = clear_merit_order(
+        q_g.reshape(n_markets, -1),
+        lambda_g.reshape(n_markets, -1),
+        q_d.reshape(n_markets, -1),
+        lambda_d.reshape(n_markets, -1),
+    )
+    return MarketClearing(
+        P_G=clearing.P_G.reshape(q_g.shape),
+        P_D=clearing.P_D.reshape(q_d.shape),
+        volume=clearing.volume,
+        price=clearing.price,
+        welfare=clearing.welfare,
+    )
+
+
+def stack_auctions(instances: list[ConcreteModel]) -> tuple:
+    """
+    Stacked bids of single-period auction instances with the
+    same agents and blocks, of shape (market, agent, block)
+    """
+    first = instances[0]
+    sets = ["G", "B_G", "D", "B_D"]
+    for n, instance in enumerate(instances[1:], start=1):
+        for name in sets:
+            if list(getattr(instance, name)) != list(getattr(first, name)):
+                raise ValueError(
+                    f"Instance {n} has another {name} set than instance 0: "
+                    "only auctions with the same agents and blocks can be stacked"
+                )
+
+    arrays = [auction_arrays(instance) for instance in instances]
+    shape_g = (len(instances), len(first.G), len(first.B_G))
+    shape_d = (len(instances), len(first.D), len(first.B_D))
+    return tuple(
+        np.stack([a[i] for a in arrays]).reshape(shape_g if i < 2 else shape_d)
+        for i in range(4)
+    )
@@ -0,0 +1,26 @@
+import os
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+
+def _use_src():
+    # The modules of the exercise import each other from src (as the
+    # scripts run there). The exercises share package names (instances,
+    # models, solvers), so those imported from another one are dropped.
+    if SRC in sys.path:
+        sys.path.remove(SRC)
+    sys.path.insert(0, SRC)
+    for name, module in list(sys.modules.items()):
+        if name.split(".")[0] in ("instances", "models", "solvers") and not (
+            getattr(module, "__file__", None) or ""
+        ).startswith(SRC):
+            del sys.modules[name]
+
+
+_use_src()
+
+
+def pytest_pycollect_makemodule(module_path, parent):
+    # Before importing every test module of the exercise
+    _use_src()
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from pyomo.environ import SolverFactory, TerminationCondition, value
+
+from models.single_period_auction import model
+from solvers.merit_order import (
+    clear_instance,
+    clear_markets,
+    clear_merit_order,
+    stack_auctions,
+)
+
+
+def random_instance(rng, n_generators, n_demands, n_blocks):
+    G = list(range(1, n_generators + 1))
+    D = list(range(1, n_demands + 1))
+    B = list(range(1, n_blocks + 1))
+    # Few distinct prices, so that ties between blocks are frequent
+    prices = lambda n: rng.integers(1, 20, n).astype(float)
+
+    def blocks(agents, values):
+        return {(a, k): float(v) for (a, k), v in zip(((a, k) for a in agents for k in B), values)}
+
+    n_g, n_d = n_generators * n_blocks, n_demands * n_blocks
+    unit = {i: 0.0 for i in G}
+    data = {
+        None: {
+            "G": {None: G},
+            "D": {None: D},
+            "B_G": {None: B},
+            "B_D": {None: B},
+            "P_max": unit,
+            "P_min": unit,
+            "R_up": unit,
+            "R_dn": unit,
+            "P_0": unit,
+            "U_0": unit,
+            "P_B_G": blocks(G, rng.integers(0, 10, n_g)),
+            "Lambda_B_G": blocks(G, prices(n_g)),
+            "P_B_D": blocks(D, rng.integers(0, 10, n_d)),
+            "Lambda_B_D": blocks(D, prices(n_d)),
+        }
+    }
+    return model.create_instance(data)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_lp(seed):
+    rng = np.random.default_rng(seed)
+    instance = random_instance(rng, *rng.integers(1, 5, 3))
+
+    results = SolverFactory("highs").solve(instance)
+    assert results.solver.termination_condition == TerminationCondition.optimal
+    welfare = value(instance.obj)
+
+    clearing = clear_instance(instance)
+    assert clearing.welfare == pytest.approx(welfare, abs=1e-6)
+    # The accepted quantities loaded into the instance are feasible and optimal
+    assert value(instance.obj) == pytest.approx(welfare, abs=1e-6)
+    assert clearing.P_G.sum() == pytest.approx(clearing.volume)
+    assert clearing.P_D.sum() == pytest.approx(clearing.volume)
+    for i, k in instance.P_G:
+        assert -1e-9 <= value(instance.P_G[i, k]) <= value(instance.P_B_G[i, k]) + 1e-9
+    for d, k in instance.P_D:
+        assert -1e-9 <= value(instance.P_D[d, k]) <= value(instance.P_B_D[d, k]) + 1e-9
+
+
+def test_no_trade():
+    clearing = clear_merit_order([10.0], [20.0], [10.0], [15.0])
+    assert clearing.volume == 0
+    assert clearing.welfare == 0
+    assert 15.0 <= clearing.price <= 20.0
+
+
+def test_batched_markets_match_single_clearings():
+    rng = np.random.default_rng(0)
+    shape_g, shape_d = (200, 3, 4), (200, 2, 4)
+    bids = (
+        rng.uniform(0, 10, shape_g),
+        rng.uniform(0, 50, shape_g),
+        rng.uniform(0, 10, shape_d),
+        rng.uniform(0, 50, shape_d),
+    )
+    markets = clear_markets(*bids)
+    for m in range(shape_g[0]):
+        single = clear_merit_order(*(b[m].ravel() for b in bids))
+        assert markets.welfare[m] == pytest.approx(single.welfare)
+        assert markets.price[m] == pytest.approx(single.price)
+        np.testing.assert_allclose(markets.P_G[m].ravel(), single.P_G)
+
+
+def test_stack_auctions_requires_same_agents():
+    rng = np.random.default_rng(0)
+    same = [random_instance(rng, 3, 2, 2) for _ in range(2)]
+    supply_quantity, _, demand_quantity, _ = stack_auctions(same)
+    assert supply_quantity.shape == (2, 3, 2)
+    assert demand_quantity.shape == (2, 2, 2)
+
+    with pytest.raises(ValueError, match="G set"):
+        stack_auctions([same[0], random_instance(rng, 4, 2, 2)])
@@ -0,0 +1,188 @@
+"""
+This module contains the benchmark suite of the SDED
+frontier, which times separately, for every model,
+scenario count, generator count and beta grid size:
+    - sample: sampling the demand scenarios
+    - data: conversion of the sampled arrays to Pyomo data
+    - build: Pyomo construction of the instance
+    - write: loading the instance into HiGHS
+    - solve: HiGHS solve
+Every beta of the grid is rebuilt and re-solved, as in
+main.py, and the stage times are summed over the grid.
+Each case runs in a fresh process, so that its peak
+resident memory can be recorded too.
+
+Usage (from exercise7/src):
+    python benchmark.py --scenarios 10 100 1000 --betas 1 11 --output bench
+writes bench.json and bench.csv.
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from instances.generate import (
+    GENERATORS,
+    instance_data,
+    instance_from_data,
+    sample_scenarios,
+)
+from sweeps import persistent_highs
+
+MODELS = {
+    "cvar": ("models.sded_cvar", 0.05),
+    "mean_variance": ("models.sded_mean_variance", None),
+    "mean_variance_deviation": ("models.sded_mean_variance_deviation", None),
+}
+
+
+def scaled_generators(n_generators: int) -> dict:
+    """
+    n_generators units obtained by splitting the units of
+    GENERATORS evenly, so that the total capacity and the
+    system cost curve stay (roughly) the same
+    """
+    base = list(GENERATORS["cq"])
+    parts = n_generators / len(base)
+
+    generators = {param: {} for param in GENERATORS}
+    for i in range(n_generators):
+        unit = base[i % len(base)]
+        name = f"G{i + 1}"
+        generators["cq"][name] = GENERATORS["cq"][unit] * parts
+        generators["cl"][name] = GENERATORS["cl"][unit]
+        generators["cb"][name] = GENERATORS["cb"][unit] / parts
+        generators["pgmin"][name] = GENERATORS["pgmin"][unit] / parts
+        generators["pgmax"][name] = GENERATORS["pgmax"][unit] / parts
+
+    return generators
+
+
+def _peak_memory_mb() -> float:
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":
+        return maxrss / 2**20
+    return maxrss / 2**10
+
+
+def run_case(
+    model: str, n_scenarios: int, n_generators: int, n_betas: int, seed: int
+) -> dict:
+    module_name, alpha = MODELS[model]
+    abstract_model = import_module(module_name).model
+    generators = scaled_generators(n_generators)
+    rng = np.random.default_rng(seed)
+
+    times = {"sample": 0.0, "data": 0.0, "build": 0.0, "write": 0.0, "solve": 0.0}
+    termination = set()
+
+    for beta in np.linspace(0, 1, n_betas):
+        t = time.perf_counter()
+        scenarios = sample_scenarios(n_scenarios, 0.05, rng)
+        times["sample"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        data = instance_data(**scenarios._asdict(), generators=generators)
+        times["data"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        inst = instance_from_data(abstract_model, data, beta=beta, alpha=alpha)
+        times["build"] += time.perf_counter() - t
+
+        solver = persistent_highs()
+
+        t = time.perf_counter()
+        solver.set_instance(inst)
+        times["write"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        sol = solver.solve(inst)
+        times["solve"] += time.perf_counter() - t
+
+        termination.add(sol.termination_condition.name)
+
+    return {
+        "model": model,
+        "n_scenarios": n_scenarios,
+        "n_generators": n_generators,
+        "n_betas": n_betas,
+        **{f"{stage}_s": elapsed for stage, elapsed in times.items()},
+        "total_s": sum(times.values()),
+        "peak_memory_mb": _peak_memory_mb(),
+        "termination": ",".join(sorted(termination)),
+    }
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import highspy
+    import pyomo
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pyomo": pyomo.version.version,
+        "highspy": highspy.__version__ if hasattr(highspy, "__version__") else None,
+        "machine": platform.machine(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SDED build and solve benchmark")
+    parser.add_argument(
+        "--models", nargs="+", choices=list(MODELS), default=["cvar", "mean_variance_deviation"]
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", type=int, default=[10, 100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--generators", nargs="+", type=int, default=[3])
+    parser.add_argument("--betas", nargs="+", type=int, default=[1])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="benchmark")
+    args = parser.parse_args()
+
+    results = []
+    for model, n_scenarios, n_generators, n_betas in product(
+        args.models, args.scenarios, args.generators, args.betas
+    ):
+        # A fresh process per case isolates its peak memory
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            row = executor.submit(
+                run_case, model, n_scenarios, n_generators, n_betas, args.seed
+            ).result()
+
+        print(
+            f"{row['model']:<25} | S={row['n_scenarios']:<7} | G={row['n_generators']:<4} | "
+            f"B={row['n_betas']:<4} | sample {row['sample_s']:.3f}s | data {row['data_s']:.3f}s | build {row['build_s']:.3f}s | "
+            f"write {row['write_s']:.3f}s | solve {row['solve_s']:.3f}s | {row['peak_memory_mb']:.0f} MB"
+        )
+        results.append(row)
+
+    metadata = _metadata()
+
+    with open(f"{args.output}.json", "w") as f:
+        json.dump({"metadata": metadata, "results": results}, f, indent=2)
+
+    df = pd.DataFrame(results)
+    df.insert(0, "commit", metadata["commit"])
+    df.to_csv(f"{args.output}.csv", index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+This module contains the out-of-sample evaluation of
+SDED dispatch decisions: the imbalance cost of every
+decision is computed over a large independent demand
+sample, instead of over the scenarios it was optimized
+on, which gives its
+    - expected imbalance cost
+    - variance of the imbalance cost
+    - empirical VaR and CVaR of the imbalance cost
+The sample is streamed in chunks, each drawn from its own
+stream spawned from seed, and all the decisions are
+evaluated together as a (decisions, chunk) matrix, so the
+memory only depends on chunk_size. As the quantile needs
+the whole sample, the chunks are drawn three times:
+    1. mean, variance and range of the imbalance cost
+    2. histogram of the imbalance cost, which gives the VaR
+       up to its bin width
+    3. CVaR as VaR + 1/(1 - alpha) E[(L - VaR)^+]
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from instances.generate import GENERATORS, sample_scenarios
+
+
+def _chunks(n_samples: int, chunk_size: int, sigma: float, seed: int):
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+
+    for size, seed_seq in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))):
+        yield sample_scenarios(size, sigma, np.random.default_rng(seed_seq))
+
+
+def _imbalance_costs(x: np.ndarray, scenarios) -> np.ndarray:
+    # (decisions, chunk) matrix of imbalance costs
+    shortfall = scenarios.pd0[None, :] - x[:, None]
+    return np.where(
+        shortfall > 0,
+        scenarios.la_c[None, :] * shortfall,
+        -scenarios.la_s[None, :] * shortfall,
+    )
+
+
+def evaluate_generation(
+    x: np.ndarray,
+    n_samples: int,
+    sigma: float,
+    alpha: float,
+    seed: int,
+    chunk_size: Optional[int] = None,
+    n_bins: int = 4096,
+) -> pd.DataFrame:
+    """
+    Out-of-sample imbalance statistics of every total generation
+    x (the imbalance only depends on the total). By default, the
+    chunks hold about 2^23 imbalance costs in total.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    n_decisions = len(x)
+
+    if chunk_size is None:
+        chunk_size = max(1, 2**23 // n_decisions)
+
+    # 1. Mean, variance and range
+    total = np.zeros(n_decisions)
+    total_sq = np.zeros(n_decisions)
+    lo = np.full(n_decisions, np.inf)
+    hi = np.full(n_decisions, -np.inf)
+
+    for scenarios in _chunks(n_samples, chunk_size, sigma, seed):
+        losses = _imbalance_costs(x, scenarios)
+        total += losses.sum(axis=1)
+        total_sq += np.square(losses).sum(axis=1)
+        lo = np.minimum(lo, losses.min(axis=1))
+        hi = np.maximum(hi, losses.max(axis=1))
+
+    mean = total / n_samples
+    variance = np.maximum(total_sq / n_samples - mean**2, 0)
+
+    # 2. VaR, as the upper edge of the bin reaching alpha
+    width = np.maximum(hi - lo, 1e-12) / n_bins
+    offsets = np.arange(n_decisions)[:, None] * n_bins
+    counts = np.zeros(n_decisions * n_bins, dtype=np.int64)
+
+    for scenarios in _chunks(n_samples, chunk_size, sigma, seed):
+        losses = _imbalance_costs(x, scenarios)
+        bins = np.minimum(((losses - lo[:, None]) / width[:, None]).astype(int), n_bins - 1)
+        counts += np.bincount((offsets + bins).ravel(), minlength=len(counts))
+
+    cdf = np.cumsum(counts.reshape(n_decisions, n_bins), axis=1) / n_samples
+    var_bins = np.argmax(cdf >= alpha - 1e-12, axis=1)
+    var = lo + (var_bins + 1) * width
+
+    # 3. CVaR
+    excess = np.zeros(n_decisions)
+    for scenarios in _chunks(n_samples, chunk_size, sigma, seed):
+        losses = _imbalance_costs(x, scenarios)
+        excess += np.maximum(losses - var[:, None], 0).sum(axis=1)
+
+    cvar = var + excess / n_samples / (1.0 - alpha)
+
+    return pd.DataFrame(
+        {
+            "Total_Generation": x,
+            "OOS_Expected_Imbalance": mean,
+            "OOS_Imbalance_Variance": variance,
+            "OOS_VaR": var,
+            "OOS_CVaR": cvar,
+        }
+    )
+
+
+def evaluate_decisions(
+    p_g: np.ndarray,
+    n_samples: int,
+    sigma: float,
+    alpha: float,
+    seed: int,
+    generators: Optional[dict] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Out-of-sample evaluation of dispatch decisions P_G, one per
+    row of p_g, with the generators in the order of generators
+    (GENERATORS when not given). Adds their generation cost.
+    """
+    if generators is None:
+        generators = GENERATORS
+
+    p_g = np.atleast_2d(np.asarray(p_g, dtype=float))
+    cq = np.array(list(generators["cq"].values()))
+    cl = np.array(list(generators["cl"].values()))
+    cb = np.array(list(generators["cb"].values()))
+
+    df = evaluate_generation(p_g.sum(axis=1), n_samples, sigma, alpha, seed, **kwargs)
+    df.insert(1, "Generation_Cost", (cq * p_g**2 + cl * p_g + cb).sum(axis=1))
+    df["OOS_Total_Expected_Cost"] = df["Generation_Cost"] + df["OOS_Expected_Imbalance"]
+    return df
+
+
+def evaluate_results(
+    df_results: pd.DataFrame,
+    n_samples: int,
+    sigma: float,
+    alpha: float,
+    seed: int,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    The rows of a sweep with their out-of-sample evaluation,
+    all evaluated in one batched pass
+    """
+    df = evaluate_generation(
+        df_results["Total_Generation"].to_numpy(), n_samples, sigma, alpha, seed, **kwargs
+    )
+    df = df.drop(columns="Total_Generation").set_index(df_results.index)
+
+    df_results = pd.concat([df_results, df], axis=1)
+    df_results["OOS_Total_Expected_Cost"] = (
+        df_results["Generation_Cost"] + df_results["OOS_Expected_Imbalance"]
+    )
+    return df_results
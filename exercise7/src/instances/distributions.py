@@ -0,0 +1,174 @@
+"""
+This module contains the distributions from which
+the demand noise of the scenarios is sampled.
+They draw straight from np.random.Generator, and
+scipy is only imported by the distributions which
+need it (i.e. the truncated normal), when sampled.
+
+The normal and lognormal distributions are batched:
+given arrays of parameters, sample(n) draws n values
+of every stream at once, with shape (*params, n).
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class Distribution(ABC):
+    """
+    Base class of the distributions, which holds their
+    random generator: rng if given, otherwise a generator
+    seeded with seed (or with fresh entropy). Subclasses
+    implement sample.
+    """
+
+    def __init__(self, rng: np.random.Generator = None, seed: int = None):
+        if rng is not None:
+            self.rng = rng
+        elif seed is not None:
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.rng = np.random.default_rng()
+
+    @abstractmethod
+    def sample(self, n: int) -> np.ndarray:
+        """
+        n values of the distribution
+        """
+
+
+def _batched(mu: ArrayLike, sigma: ArrayLike, n: int) -> tuple:
+    # Parameters broadcast along the streams, and sample size
+    mu, sigma = np.broadcast_arrays(np.asarray(mu, float), np.asarray(sigma, float))
+    return mu[..., None], sigma[..., None], mu.shape + (n,)
+
+
+class NormalDistribution(Distribution):
+    """
+    A Normal-distributed random variables of parameters
+        - mu: Mean value of the distribution
+        - sigma: Standard deviation of the dsitribution
+    """
+
+    def __init__(
+        self,
+        mu: ArrayLike,
+        sigma: ArrayLike,
+        rng: np.random.Generator = None,
+        seed: int = None,
+    ):
+        super().__init__(rng, seed)
+        self.mu = mu
+        self.sigma = sigma
+        self.params = {"mu": mu, "sigma": sigma}
+
+    def sample(self, n: int) -> np.ndarray:
+        loc, scale, size = _batched(self.mu, self.sigma, n)
+        return self.rng.normal(loc=loc, scale=scale, size=size)
+
+
+class LogNormalDistribution(Distribution):
+    """
+    A Lognormal-distributed random variable of parameters
+        - mu: Mean value of the distribution
+        - sigma: Standard deviation of the distribution
+    (i.e. not the parameters of the underlying normal)
+    """
+
+    def __init__(
+        self,
+        mu: ArrayLike,
+        sigma: ArrayLike,
+        rng: np.random.Generator = None,
+        seed: int = None,
+    ):
+        super().__init__(rng, seed)
+        self.mu = mu
+        self.sigma = sigma
+        self.params = {"mu": mu, "sigma": sigma}
+
+    def sample(self, n: int) -> np.ndarray:
+        mu, sigma, size = _batched(self.mu, self.sigma, n)
+        log_var = np.log1p((sigma / mu) ** 2)
+        return self.rng.lognormal(
+            mean=np.log(mu) - log_var / 2, sigma=np.sqrt(log_var), size=size
+        )
+
+
+class TruncatedNormalDistribution(Distribution):
+    """
+    A Normal-distributed random variable of parameters
+        - mu: Mean value of the (untruncated) distribution
+        - sigma: Standard deviation of the (untruncated) distribution
+    truncated to [lower, upper]
+    """
+
+    def __init__(
+        self,
+        mu: float,
+        sigma: float,
+        lower: float = 0.0,
+        upper: float = np.inf,
+        rng: np.random.Generator = None,
+        seed: int = None,
+    ):
+        super().__init__(rng, seed)
+        self.mu = mu
+        self.sigma = sigma
+        self.lower = lower
+        self.upper = upper
+        self.params = {"mu": mu, "sigma": sigma, "lower": lower, "upper": upper}
+
+    def sample(self, n: int) -> np.ndarray:
+        from scipy.stats import truncnorm
+
+        return truncnorm.rvs(
+            a=(self.lower - self.mu) / self.sigma,
+            b=(self.upper - self.mu) / self.sigma,
+            loc=self.mu,
+            scale=self.sigma,
+            size=n,
+            random_state=self.rng,
+        )
+
+
+class EmpiricalDistribution(Distribution):
+    """
+    The empirical distribution of observed values,
+    sampled by bootstrap (with replacement)
+    """
+
+    def __init__(
+        self, values: np.ndarray, rng: np.random.Generator = None, seed: int = None
+    ):
+        super().__init__(rng, seed)
+        self.values = np.asarray(values, dtype=float)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        column: int = 0,
+        delimiter: Optional[str] = None,
+        skiprows: int = 0,
+        normalize: bool = True,
+        rng: np.random.Generator = None,
+        seed: int = None,
+    ) -> "EmpiricalDistribution":
+        """
+        Values of a column of a historical load file. With
+        normalize, they are divided by their mean, to be
+        used as the (mean 1) noise of the scenarios.
+        """
+        values = np.loadtxt(
+            path, delimiter=delimiter, skiprows=skiprows, usecols=column, ndmin=1
+        )
+        if normalize:
+            values = values / values.mean()
+        return cls(values, rng=rng, seed=seed)
+
+    def sample(self, n: int) -> np.ndarray:
+        return self.rng.choice(self.values, size=n, replace=True)
@@ -0,0 +1,61 @@
+"""
+This module contains the scenario reduction
+which compresses a large Monte-Carlo sample
+into a few representative scenarios with
+adjusted probabilities
+"""
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from instances.generate import Scenarios
+
+
+def reduce_scenarios(
+    scenarios: "Scenarios", n_reduced: int
+) -> tuple["Scenarios", float]:
+    """
+    Quantile binning on the 1-D demand: the scenarios are sorted
+    by pd0 and split into n_reduced bins of (almost) equal size.
+    Each bin is represented by its mean scenario, with probability
+    the total probability of the bin, so the expected demand and
+    penalizations are preserved.
+
+    Returns the reduced scenarios and the reduction error, as the
+    Wasserstein (Kantorovich) distance between the original and
+    the reduced distributions of pd0 (MW).
+    """
+    n_scenarios = len(scenarios.pd0)
+    if not 0 < n_reduced <= n_scenarios:
+        raise ValueError(
+            f"Cannot reduce {n_scenarios} scenarios to {n_reduced} scenarios"
+        )
+
+    if scenarios.pi is None:
+        pi = np.full(n_scenarios, 1 / float(n_scenarios))
+    else:
+        pi = np.asarray(scenarios.pi)
+
+    order = np.argsort(scenarios.pd0, kind="stable")
+    bin_starts = np.arange(n_reduced) * n_scenarios // n_reduced
+    bin_sizes = np.diff(np.append(bin_starts, n_scenarios))
+
+    pi_sorted = pi[order]
+    pi_reduced = np.add.reduceat(pi_sorted, bin_starts)
+
+    def _bin_mean(arr: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(pi_sorted * arr[order], bin_starts) / pi_reduced
+
+    reduced = scenarios._replace(
+        pd0=_bin_mean(scenarios.pd0),
+        la_c=_bin_mean(scenarios.la_c),
+        la_s=_bin_mean(scenarios.la_s),
+        pi=pi_reduced,
+    )
+
+    # Every scenario is transported to the mean of its bin
+    representative = np.repeat(reduced.pd0, bin_sizes)
+    distance = float(np.sum(pi_sorted * np.abs(scenarios.pd0[order] - representative)))
+
+    return reduced, distance
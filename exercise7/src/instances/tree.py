@@ -0,0 +1,149 @@
+"""
+This module contains the scenario tree of the
+multi-period SDED (models/sded_cvar_tree.py), which is
+sampled and stored as flat per-node arrays, and the
+function which creates an instance from it
+"""
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from pyomo.environ import AbstractModel, ConcreteModel
+
+from instances.distributions import NormalDistribution
+from instances.generate import GENERATORS, _positive_cutoff
+
+# Ramping parameters of the generation units of GENERATORS
+RAMPING = {
+    "R_up": {"G1": 40, "G2": 40, "G3": 60},
+    "R_dn": {"G1": 40, "G2": 40, "G3": 60},
+    "P_0": {"G1": 240, "G2": 240, "G3": 320},
+}
+
+
+class ScenarioTree(NamedTuple):
+    """
+    Nodes 0..n-1 in period order, 0 being the root (period 0).
+    parent[0] is -1, and the per-node parameters of the root
+    (which realizes no demand) are NaN.
+    """
+
+    parent: np.ndarray
+    period: np.ndarray
+    pi: np.ndarray
+    pd0: np.ndarray
+    la_c: np.ndarray
+    la_s: np.ndarray
+
+    @property
+    def n_periods(self) -> int:
+        return int(self.period[-1])
+
+
+def sample_tree(
+    branching: Sequence[int],
+    sigma: float,
+    rng: np.random.Generator,
+    profile: Optional[Sequence[float]] = None,
+) -> ScenarioTree:
+    """
+    Sample a tree of len(branching) periods, where every node of
+    period t - 1 has branching[t - 1] equiprobable children.
+    The demand of a node is its period's share of the load
+    profile (flat by default) times a noise which follows a
+    multiplicative random walk along the tree:
+        noise(n) = noise(parent(n)) * Normal(1, sigma)
+    The penalizations scale with the noise as in generate.py.
+
+    e.g. branching = [3, 3, 2] + [1] * 21 gives a 24-period
+    tree of 18 paths, but only 1 + 3 + 9 + 18 * 22 = 409 nodes.
+    """
+    if profile is None:
+        profile = np.ones(len(branching))
+    profile = np.asarray(profile, dtype=float)
+
+    distribution = NormalDistribution(mu=1, sigma=sigma, rng=rng)
+
+    parent = [np.array([-1])]
+    period = [np.array([0])]
+    pi = [np.array([1.0])]
+    noise = [np.array([1.0])]
+
+    first = 0  # First node of the previous period
+    for t, n_children in enumerate(branching, start=1):
+        n_prev = len(pi[-1])
+
+        parent.append(np.repeat(np.arange(first, first + n_prev), n_children))
+        period.append(np.full(n_prev * n_children, t))
+        pi.append(np.repeat(pi[-1] / n_children, n_children))
+        noise.append(
+            np.repeat(noise[-1], n_children) * distribution.sample(n_prev * n_children)
+        )
+
+        first += n_prev
+
+    noise = np.concatenate(noise)
+    period = np.concatenate(period)
+
+    load = np.concatenate([[np.nan], profile])[period]
+    noise[0] = np.nan
+
+    return ScenarioTree(
+        parent=np.concatenate(parent),
+        period=period,
+        pi=np.concatenate(pi),
+        pd0=_positive_cutoff(800 * load * noise),
+        la_c=_positive_cutoff(1.5 * noise),
+        la_s=_positive_cutoff(1.0 * noise),
+    )
+
+
+def build_tree_instance(
+    abstract_model: AbstractModel,
+    tree: ScenarioTree,
+    beta: float,
+    alpha: float,
+    generators: Optional[dict] = None,
+    ramping: Optional[dict] = None,
+) -> ConcreteModel:
+    """
+    Create an instance from the per-node arrays of the tree.
+    When generators (ramping) is not given GENERATORS (RAMPING)
+    is used.
+    """
+    if generators is None:
+        generators = GENERATORS
+    if ramping is None:
+        ramping = RAMPING
+
+    nodes = np.arange(len(tree.parent))
+    realized = nodes[1:].tolist()
+
+    def _per_node(arr: np.ndarray) -> dict:
+        return dict(zip(realized, arr[1:].tolist()))
+
+    data = {
+        None: {
+            # Sets
+            "G": {None: list(generators["cq"])},
+            "T": {None: list(range(1, tree.n_periods + 1))},
+            "N": {None: nodes.tolist()},
+            "D": {None: nodes[tree.period < tree.n_periods].tolist()},
+            "R": {None: realized},
+            # Generation unit parameters
+            **generators,
+            **ramping,
+            # Tree parameters
+            "parent": _per_node(tree.parent),
+            "period": _per_node(tree.period),
+            "pi": dict(zip(nodes.tolist(), tree.pi.tolist())),
+            "pd0": _per_node(tree.pd0),
+            "la_c": _per_node(tree.la_c),
+            "la_s": _per_node(tree.la_s),
+            # Risk parameters
+            "beta": {None: beta},
+            "alpha": {None: alpha},
+        }
+    }
+
+    return abstract_model.create_instance(data=data)
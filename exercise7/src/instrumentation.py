@@ -0,0 +1,61 @@
+"""
+This module contains the instrumentation of the
+SDED sweeps, which records for every (model, beta) solve:
+    - Build_Time: sampling and Pyomo construction of the instance (s)
+    - Solve_Time: wall time of the HiGHS call, including
+      loading the instance into HiGHS (s)
+    - HiGHS_Time: run time reported by HiGHS itself (s)
+    - Simplex_Iterations, IPM_Iterations, QP_Iterations
+    - Termination: termination condition of HiGHS
+    - Variables, Constraints, Nonzeros: size of the instance
+and, optionally, appends them to a structured log
+(one JSON object per line).
+"""
+import json
+from typing import Optional
+
+from pyomo.contrib.solver.common.results import Results
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.environ import ConcreteModel, Constraint, Var
+
+
+def instance_stats(inst: ConcreteModel, build_time: float) -> dict:
+    """
+    Build time and size of an instance. Nonzeros counts
+    the entries of the constraint matrix only (i.e. not
+    the quadratic objective terms).
+    """
+    constraints = list(inst.component_data_objects(Constraint, active=True))
+
+    return {
+        "Build_Time": build_time,
+        "Variables": sum(1 for _ in inst.component_data_objects(Var)),
+        "Constraints": len(constraints),
+        "Nonzeros": sum(
+            sum(1 for _ in identify_variables(c.body, include_fixed=False))
+            for c in constraints
+        ),
+    }
+
+
+def solver_stats(sol: Results) -> dict:
+    """
+    Solver statistics of a HiGHS solve. The iteration
+    counts are None when HiGHS did not report them.
+    """
+    return {
+        "Termination": sol.termination_condition.name,
+        "Solve_Time": sol.timing_info.wall_time,
+        "HiGHS_Time": getattr(sol.timing_info, "highs_time", None),
+        "Simplex_Iterations": getattr(sol.extra_info, "simplex_iteration_count", None),
+        "IPM_Iterations": getattr(sol.extra_info, "ipm_iteration_count", None),
+        "QP_Iterations": getattr(sol.extra_info, "qp_iteration_count", None),
+    }
+
+
+def log_run(log_path: Optional[str], record: dict):
+    if log_path is None:
+        return
+
+    with open(log_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
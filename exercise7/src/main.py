@@ -1,16 +1,45 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
-from pyomo.environ import SolverFactory, TerminationCondition, value
-
-from instances.generate import generate_instance
-from models.sded_mean_variance import model as mean_variance_model
-from models.sded_cvar import model as cvar_model
-from plots import plot_efficient_frontiers
-
-
-
-def main():
+from pyomo.environ import SolverFactory, TerminationCondition
+
+from instances.generate import (
+    generate_crn_instance,
+    generate_instance,
+    sample_scenarios,
+)
+from instrumentation import instance_stats
+from models import sded_cvar, sded_mean_variance, sded_mean_variance_deviation
+from results_store import ResultsSink, read_results
+from sweeps import (
+    adaptive_cvar_sweep,
+    collect_results,
+    instrumented_solve,
+    keep_row,
+    parallel_sweep,
+    persistent_highs,
+    persistent_sweep,
+)
+
+
+
+def main(
+    persistent: bool = False,
+    deviation_variance: bool = False,
+    n_workers: Optional[int] = None,
+    common_random_numbers: bool = False,
+    n_reduced: Optional[int] = None,
+    instrument: bool = False,
+    log_path: Optional[str] = None,
+    results_path: Optional[str] = None,
+    adaptive_cvar: bool = False,
+    beta_values: Optional[np.ndarray] = None,
+):
     main_seed = 1234
     rng = np.random.default_rng(seed=main_seed)
 
@@ -20,63 +49,194 @@ def main():
     sigma = 0.05
     alpha_cvar = 0.05
 
-    beta_values = np.arange(0, 1.01, 0.01)
+    if beta_values is None:
+        beta_values = np.arange(0, 1.01, 0.01)
+
+    # With common random numbers every beta and risk model
+    # is solved over the same demand sample
+    crn_seed = main_seed if common_random_numbers else None
+
+
+    # Instrumentation adds the build and solver statistics of
+    # every run to the results, and logs them to log_path
+    instrument = instrument or log_path is not None
+    if instrument:
+        solver = persistent_highs()
 
     results = []
 
+    # The deviation-variable formulation keeps the variance term
+    # linear in |S|, which is needed for large scenario counts.
+    # It is also the only Mean-Variance model with a mutable beta,
+    # so the persistent sweep needs it.
+    mean_variance = (
+        sded_mean_variance_deviation if deviation_variance else sded_mean_variance
+    )
+    if persistent and not deviation_variance:
+        print(
+            "Persistent sweep: Mean-Variance solved with sded_mean_variance_deviation "
+            "(sded_mean_variance declares beta as an immutable Param)"
+        )
+        mean_variance = sded_mean_variance_deviation
+
     models_config = {
-        "Mean-Variance": {"abstract": mean_variance_model, "alpha": None},
-        "CVaR": {"abstract": cvar_model, "alpha": alpha_cvar},
+        "Mean-Variance": {"module": mean_variance, "alpha": None},
+        "CVaR": {"module": sded_cvar, "alpha": alpha_cvar},
     }
 
+    # The adaptive CVaR frontier is traced with the specialized
+    # solver, over the common random numbers of main_seed
+    adaptive_config = models_config.pop("CVaR") if adaptive_cvar else None
+
+    # With results_path, every row is streamed to the store as
+    # soon as it is solved (and not kept in memory), and the rows
+    # of the same run configuration already there are skipped
+    sink = None
+    if results_path is not None:
+        if n_workers is not None:
+            driver = "parallel"
+        elif persistent:
+            driver = "persistent"
+        else:
+            driver = "rebuild"
+        sink = ResultsSink(
+            results_path,
+            sigma=sigma,
+            seed=main_seed,
+            N_Scenarios=n_scenarios,
+            Alpha=alpha_cvar,
+            N_Reduced=n_reduced,
+            CRN=common_random_numbers,
+            Mean_Variance=mean_variance.__name__,
+            Driver=driver,
+            Adaptive_CVaR=adaptive_cvar,
+        )
+
     print(
         f"{'Model':<15} | {'Beta':<5} | {'Obj':<10} | {'Gen Cost':<10} | {'Risk (Obj)':<10} | {'Avg Demand':<10}"
     )
     print("-" * 85)
 
-    for model_name, config in models_config.items():
-        for beta in beta_values:
-            inst = generate_instance(
-                abstract_model=config["abstract"],
+    try:
+        if n_workers is not None:
+            results = parallel_sweep(
+                models_config=models_config,
+                beta_values=beta_values,
                 n_scenarios=n_scenarios,
                 sigma=sigma,
-                beta=beta,
-                alpha=config["alpha"],
-                rng=rng,
+                seed=main_seed,
+                max_workers=n_workers,
+                common_random_numbers=common_random_numbers,
+                n_reduced=n_reduced,
+                instrument=instrument,
+                log_path=log_path,
+                sink=sink,
             )
+        else:
+            for model_name, config in models_config.items():
+                if persistent:
+                    results += persistent_sweep(
+                        abstract_model=config["module"].model,
+                        model_name=model_name,
+                        beta_values=beta_values,
+                        n_scenarios=n_scenarios,
+                        sigma=sigma,
+                        alpha=config["alpha"],
+                        rng=rng,
+                        crn_seed=crn_seed,
+                        n_reduced=n_reduced,
+                        instrument=instrument,
+                        log_path=log_path,
+                        sink=sink,
+                    )
+                    continue
+
+                for beta in beta_values:
+                    if sink is not None and (model_name, beta) in sink:
+                        # Keep the demand samples of the remaining betas
+                        if not common_random_numbers:
+                            sample_scenarios(n_scenarios, sigma, rng)
+                        continue
+
+                    tic = time.perf_counter()
+                    if common_random_numbers:
+                        inst = generate_crn_instance(
+                            abstract_model=config["module"].model,
+                            n_scenarios=n_scenarios,
+                            sigma=sigma,
+                            beta=beta,
+                            alpha=config["alpha"],
+                            seed=crn_seed,
+                            n_reduced=n_reduced,
+                        )
+                    else:
+                        inst = generate_instance(
+                            abstract_model=config["module"].model,
+                            n_scenarios=n_scenarios,
+                            sigma=sigma,
+                            beta=beta,
+                            alpha=config["alpha"],
+                            rng=rng,
+                            n_reduced=n_reduced,
+                        )
+                    build_time = time.perf_counter() - tic
+
+                    if instrument:
+                        row, _ = instrumented_solve(
+                            model_name,
+                            beta,
+                            inst,
+                            solver,
+                            instance_stats(inst, build_time),
+                            log_path,
+                        )
+                        if row is not None:
+                            keep_row(row, results, sink)
+                        continue
+
+                    sol = solver.solve(inst)
+
+                    if sol.solver.termination_condition == TerminationCondition.optimal:
+                        row = collect_results(model_name, beta, inst)
+                        keep_row(row, results, sink)
+                    else:
+                        print(f"Warning: {model_name} (Beta {beta}) infeasible or failed.")
+
+        if adaptive_config is not None:
+            results += adaptive_cvar_sweep(
+                model_name="CVaR",
+                beta_values=beta_values,
+                n_scenarios=n_scenarios,
+                sigma=sigma,
+                alpha=adaptive_config["alpha"],
+                seed=main_seed,
+                n_reduced=n_reduced,
+                sink=sink,
+            )
+    finally:
+        if sink is not None:
+            sink.close()
 
-            sol = solver.solve(inst)
-
-            if sol.solver.termination_condition == TerminationCondition.optimal:
-                val_obj = value(inst.obj)
-                val_term1 = value(inst.term1_expr)
-                val_term2 = value(inst.term2_expr)
-                val_term3 = value(inst.term3_expr)
-
-                avg_demand = sum(inst.pd0[s] for s in inst.S) / n_scenarios
-
-                print(
-                    f"{model_name:<15} | {beta:.2f}  | {val_obj:.2f}     | {val_term1:.2f}     | {val_term3:.2f}       | {avg_demand:.2f}"
-                )
-
-                results.append(
-                    {
-                        "Model": model_name,
-                        "Beta": beta,
-                        "Objective": val_obj,
-                        "Generation_Cost": val_term1,
-                        "Expected_Imbalance": val_term2,
-                        "Risk_Measure": val_term3,
-                        "Total_Expected_Cost": val_term1 + val_term2,
-                        "Average_Scenario_Demand": avg_demand,
-                    }
-                )
-            else:
-                print(f"Warning: {model_name} (Beta {beta}) infeasible or failed.")
-
+    if sink is not None:
+        return read_results(results_path, config=sink.config)
     return pd.DataFrame(results)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SDED efficient frontiers")
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="do not plot the frontiers (matplotlib and seaborn are not imported)",
+    )
+    args = parser.parse_args()
+
+    # Library messages (e.g. the scenario reduction distance)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     df = main()
-    plot_efficient_frontiers(df)
+
+    if not args.no_plot:
+        from plots import plot_efficient_frontiers
+
+        plot_efficient_frontiers(df)
@@ -40,7 +40,7 @@ model.pgmin = Param(model.G)
 model.pgmax = Param(model.G)
 
 # Risk Parameters
-model.beta = Param()
+model.beta = Param(mutable=True)
 model.alpha = Param(default=0.95)
 
 model.pi = Param(model.S)  # Probability of scenario
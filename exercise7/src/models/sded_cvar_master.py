@@ -0,0 +1,87 @@
+"""
+This module contains the master problem of the L-shaped
+decomposition (solvers/lshaped.py) of the
+    Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure
+Pyomo model formulation as an
+AbstractModel.
+
+The first stage holds the dispatch P_G and the VaR, and
+the recourse of every bundle of scenarios (imbalance and
+tail costs) is approximated from below by theta[b],
+through the optimality cuts added to Cuts.
+"""
+
+from pyomo.environ import (
+    Var,
+    Param,
+    NonNegativeReals,
+    Expression,
+    Objective,
+    AbstractModel,
+    minimize,
+    Set,
+    Constraint,
+    ConstraintList,
+)
+
+model = AbstractModel(
+    name="Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure (L-shaped Master)"
+)
+
+
+# Sets
+model.G = Set()  # Set of generators
+model.B = Set()  # Set of bundles of scenarios
+
+# Parameters
+model.cq = Param(model.G)
+model.cl = Param(model.G)
+model.cb = Param(model.G)
+model.pgmin = Param(model.G)
+model.pgmax = Param(model.G)
+
+# Risk Parameters
+model.beta = Param(mutable=True)
+model.VaR_max = Param()  # Upper bound of the VaR (the largest imbalance cost)
+
+
+# Variables
+model.P_G = Var(model.G, domain=NonNegativeReals)
+model.VaR = Var(domain=NonNegativeReals, bounds=lambda m: (0, m.VaR_max))
+model.theta = Var(model.B, domain=NonNegativeReals)  # Recourse of the bundles
+
+
+# Expressions
+model.term1_expr = Expression(
+    rule=lambda m: sum(
+        m.cq[g] * (m.P_G[g] ** 2) + m.cl[g] * m.P_G[g] + m.cb[g] for g in m.G
+    )
+)
+
+model.x_expr = Expression(rule=lambda m: sum(m.P_G[g] for g in m.G))
+
+
+def Master_Objective(model):
+    return (
+        model.term1_expr
+        + model.beta * model.VaR
+        + sum(model.theta[b] for b in model.B)
+    )
+
+
+model.obj = Objective(rule=Master_Objective, sense=minimize)
+
+
+# Constraints
+def Minimum_Power_Constraint(model, g):
+    return model.P_G[g] >= model.pgmin[g]
+
+
+def Maximum_Power_Constraint(model, g):
+    return model.P_G[g] <= model.pgmax[g]
+
+
+model.Min_Power = Constraint(model.G, rule=Minimum_Power_Constraint)
+model.Max_Power = Constraint(model.G, rule=Maximum_Power_Constraint)
+
+model.Cuts = ConstraintList()
@@ -0,0 +1,160 @@
+"""
+This module contains the multi-period
+    Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure
+Pyomo model formulation as an
+AbstractModel, over a scenario tree.
+
+Every node of the tree but the root realizes the demand
+of its period, and every node of the first T - 1 periods
+(and the root) decides the dispatch of the next period,
+which its children share. Non-anticipativity is thus
+implicit in the node formulation, and the model size
+grows with the number of nodes, not with the number of
+paths times T. The dispatch of consecutive periods is
+linked by ramping limits, as in
+exercise4/src/models/multi_period_auction.py.
+
+The risk measure is the sum over the periods of the
+CVaR of the imbalance cost of the period.
+"""
+
+from pyomo.environ import (
+    Var,
+    Param,
+    NonNegativeReals,
+    Reals,
+    Expression,
+    Objective,
+    AbstractModel,
+    minimize,
+    Set,
+    Constraint,
+)
+
+model = AbstractModel(
+    name="Multi-Period Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure"
+)
+
+
+# Sets
+model.G = Set()  # Set of generators
+model.T = Set(ordered=True)  # Set of periods
+model.N = Set()  # Set of nodes of the scenario tree
+model.D = Set(within=model.N)  # Decision nodes (the root and periods 1..T-1)
+model.R = Set(within=model.N)  # Realization nodes (periods 1..T)
+
+# Parameters
+model.cq = Param(model.G)
+model.cl = Param(model.G)
+model.cb = Param(model.G)
+model.pgmin = Param(model.G)
+model.pgmax = Param(model.G)
+model.R_up = Param(model.G)  # Ramp-up limit (MW/period)
+model.R_dn = Param(model.G)  # Ramp-down limit (MW/period)
+model.P_0 = Param(model.G)  # Dispatch before the first period (MW)
+
+# Risk Parameters
+model.beta = Param(mutable=True)
+model.alpha = Param(default=0.95)
+
+model.parent = Param(model.R, within=model.D)  # Parent node
+model.period = Param(model.R, within=model.T)  # Period of the node
+model.pi = Param(model.N)  # Probability of reaching the node
+model.pd0 = Param(model.R)  # Total system load (MW)
+model.la_c = Param(model.R)  # Curtailment penalization (EUR/MW)
+model.la_s = Param(model.R)  # Surplus penalization (EUR/MW)
+
+
+# Variables
+model.P_G = Var(model.G, model.D, domain=NonNegativeReals)
+model.P_S_minus = Var(model.R, domain=NonNegativeReals)
+model.P_S_plus = Var(model.R, domain=NonNegativeReals)
+
+# CVaR Auxiliary Variables
+model.VaR = Var(model.T, domain=Reals)
+model.Tail_Loss = Var(model.R, domain=NonNegativeReals)
+
+
+# Expressions
+model.imbalance_cost = Expression(
+    model.R,
+    rule=lambda m, n: m.la_c[n] * m.P_S_minus[n] + m.la_s[n] * m.P_S_plus[n],
+)
+
+model.term1_expr = Expression(
+    rule=lambda m: sum(
+        m.pi[n] * (m.cq[g] * (m.P_G[g, n] ** 2) + m.cl[g] * m.P_G[g, n] + m.cb[g])
+        for g in m.G
+        for n in m.D
+    )
+)
+
+model.term2_expr = Expression(
+    rule=lambda m: sum(m.pi[n] * m.imbalance_cost[n] for n in m.R)
+)
+
+model.term3_expr = Expression(
+    rule=lambda m: sum(m.VaR[t] for t in m.T)
+    + (1.0 / (1.0 - m.alpha)) * sum(m.pi[n] * m.Tail_Loss[n] for n in m.R)
+)
+
+
+def CVaR_Economic_Dispatch(model):
+    return (
+        model.term1_expr
+        + (1 - model.beta) * model.term2_expr
+        + model.beta * model.term3_expr
+    )
+
+
+model.obj = Objective(rule=CVaR_Economic_Dispatch, sense=minimize)
+
+
+# Constraints
+def Matched_Demand(model, n):
+    return (
+        sum(model.P_G[g, model.parent[n]] for g in model.G)
+        + model.P_S_minus[n]
+        - model.P_S_plus[n]
+        == model.pd0[n]
+    )
+
+
+model.Power_Balance = Constraint(model.R, rule=Matched_Demand)
+
+
+def Minimum_Power_Constraint(model, g, n):
+    return model.P_G[g, n] >= model.pgmin[g]
+
+
+def Maximum_Power_Constraint(model, g, n):
+    return model.P_G[g, n] <= model.pgmax[g]
+
+
+model.Min_Power = Constraint(model.G, model.D, rule=Minimum_Power_Constraint)
+model.Max_Power = Constraint(model.G, model.D, rule=Maximum_Power_Constraint)
+
+
+def Ramp_Up_Limit(model, g, n):
+    if n not in model.R:
+        return model.P_G[g, n] - model.P_0[g] <= model.R_up[g]
+    else:
+        return model.P_G[g, n] - model.P_G[g, model.parent[n]] <= model.R_up[g]
+
+
+def Ramp_Down_Limit(model, g, n):
+    if n not in model.R:
+        return model.P_G[g, n] - model.P_0[g] >= -model.R_dn[g]
+    else:
+        return model.P_G[g, n] - model.P_G[g, model.parent[n]] >= -model.R_dn[g]
+
+
+model.Ramp_Up = Constraint(model.G, model.D, rule=Ramp_Up_Limit)
+model.Ramp_Down = Constraint(model.G, model.D, rule=Ramp_Down_Limit)
+
+
+def CVaR_Tail_Constraint(model, n):
+    return model.Tail_Loss[n] >= model.imbalance_cost[n] - model.VaR[model.period[n]]
+
+
+model.CVaR_Def = Constraint(model.R, rule=CVaR_Tail_Constraint)
@@ -3,7 +3,14 @@ import seaborn as sns
 import numpy as np
 import pandas as pd
 
-def plot_efficient_frontiers(df_results):
+from results_store import read_results
+
+def plot_efficient_frontiers(df_results, config=None):
+    # Results can also be read from a store of results_store.py
+    # (only the rows of the run configuration config, if given)
+    if not isinstance(df_results, pd.DataFrame):
+        df_results = read_results(df_results, config=config)
+
     sns.set_style("whitegrid")
     
     fig, axes = plt.subplots(1, 2, figsize=(16, 6), sharey=False)
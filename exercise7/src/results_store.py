@@ -0,0 +1,201 @@
+"""
+This module contains the on-disk store of the
+SDED sweep results, to which every row is streamed
+as soon as its solve completes, so that
+    - the memory of a sweep does not grow with its length
+      (with a store, the drivers keep no rows in memory,
+      and they are read back with read_results)
+    - a crashed or interrupted sweep can be resumed,
+      skipping the rows already in the store
+The store is either
+    - a CSV file (path ending in .csv), appended row by row
+    - a Parquet dataset (any other path), i.e. a directory
+      of part files, one per flushed chunk of rows
+Rows are identified by their (Model, Beta, Config) key, where
+Config is the run configuration (sigma, seed, scenario count,
+alpha, reduction, ...) as JSON, so that one store can hold
+the sweeps of many configurations, and a resumed sweep only
+skips the rows of its own.
+"""
+import json
+import os
+from typing import Optional, Union
+
+import pandas as pd
+
+# Rows per part file of a Parquet store
+PARQUET_CHUNK_SIZE = 100
+
+
+def _is_csv(path: Union[str, os.PathLike]) -> bool:
+    return os.fspath(path).endswith(".csv")
+
+
+def _beta_key(beta: float) -> float:
+    # Betas are compared after a round trip through the store
+    return round(float(beta), 10)
+
+
+def run_config(sigma: float, seed: int, **config) -> str:
+    """
+    Config column of the rows of a run: its sigma, seed and
+    any other setting which changes the results, as JSON
+    """
+    return json.dumps({"Sigma": sigma, "Seed": seed, **config}, sort_keys=True)
+
+
+def _has_rows(path: Union[str, os.PathLike]) -> bool:
+    # An empty CSV file or a dataset without part files has no rows
+    if not os.path.exists(path):
+        return False
+    if _is_csv(path):
+        return os.path.getsize(path) > 0
+    return any(name.endswith(".parquet") for name in os.listdir(path))
+
+
+def _columns(path: Union[str, os.PathLike]) -> list:
+    if _is_csv(path):
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    import pyarrow.dataset
+
+    return pyarrow.dataset.dataset(path, format="parquet").schema.names
+
+
+def read_results(
+    path: Union[str, os.PathLike],
+    columns: Optional[list] = None,
+    config: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Read the rows of a store (all of them, or only the given
+    columns, and only those of the run configuration config);
+    an empty DataFrame if the store does not exist
+    """
+    if not _has_rows(path):
+        return pd.DataFrame(columns=columns)
+
+    read_columns = columns
+    if config is not None and columns is not None and "Config" not in columns:
+        read_columns = [*columns, "Config"]
+
+    if _is_csv(path):
+        df = pd.read_csv(path, usecols=read_columns)
+    else:
+        df = pd.read_parquet(path, columns=read_columns)
+
+    if config is not None:
+        df = df[df["Config"] == config].reset_index(drop=True)
+        if columns is not None:
+            df = df[columns]
+    return df
+
+
+class ResultsSink:
+    """
+    Store of the rows of the sweeps of one run configuration
+    (see run_config): write() stamps every row with its sigma,
+    seed and Config, and (model_name, beta) in sink tells
+    whether that row of the run is already in the store.
+
+    Rows are buffered and written every chunk_size rows, and
+    when the sink is closed. By default, a CSV store gets every
+    row right away (it is appended to), so that a crash loses
+    no solved row, and a Parquet store a part file of every
+    PARQUET_CHUNK_SIZE rows (a crash loses at most those of
+    the last, unwritten chunk).
+
+    A store written without the Config column (i.e. before
+    it was introduced) cannot be resumed: its rows cannot be
+    told apart from those of another configuration.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        sigma: float,
+        seed: int,
+        chunk_size: Optional[int] = None,
+        **config,
+    ):
+        self.path = path
+        self.sigma = sigma
+        self.seed = seed
+        self.config = run_config(sigma, seed, **config)
+        if chunk_size is None:
+            chunk_size = 1 if _is_csv(path) else PARQUET_CHUNK_SIZE
+        self.chunk_size = chunk_size
+
+        self._buffer = []
+
+        if _has_rows(path) and "Config" not in _columns(path):
+            raise ValueError(
+                f"{path} has no Config column: its rows cannot be matched "
+                "to a run configuration, use a new store"
+            )
+
+        # Parts are numbered on from those already in the store
+        self._n_parts = 0
+        if not _is_csv(path) and os.path.isdir(path):
+            self._n_parts = sum(
+                1 for name in os.listdir(path) if name.endswith(".parquet")
+            )
+
+        done = read_results(path, columns=["Model", "Beta"], config=self.config)
+        self._done = {
+            (model_name, _beta_key(beta))
+            for model_name, beta in zip(done["Model"], done["Beta"])
+        }
+
+        if len(self._done) > 0:
+            print(f"Resuming from {path}: {len(self._done)} rows already solved")
+
+    def __contains__(self, key: tuple) -> bool:
+        model_name, beta = key
+        return (model_name, _beta_key(beta)) in self._done
+
+    def write(self, row: dict):
+        self._buffer.append(
+            {**row, "Sigma": self.sigma, "Seed": self.seed, "Config": self.config}
+        )
+        self._done.add((row["Model"], _beta_key(row["Beta"])))
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        df = pd.DataFrame(self._buffer)
+
+        if _is_csv(self.path):
+            exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            if exists:
+                # Keep the columns (and their order) of the file
+                columns = pd.read_csv(self.path, nrows=0).columns
+                missing = set(df.columns) - set(columns)
+                if missing:
+                    raise ValueError(
+                        f"{self.path} has no column for {sorted(missing)}"
+                    )
+                df = df.reindex(columns=columns)
+            df.to_csv(self.path, mode="a", header=not exists, index=False)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            df.to_parquet(
+                os.path.join(self.path, f"part-{self._n_parts:05d}.parquet"),
+                index=False,
+            )
+            self._n_parts += 1
+
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
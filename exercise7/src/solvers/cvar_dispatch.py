@@ -0,0 +1,304 @@
+"""
+This module contains a specialized solver for the
+    Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure
+which exploits that the recourse only depends on the
+total generation x = sum(P_G):
+    - the dispatch cost of x is a quadratic merit-order
+      split, solved exactly over the generators' breakpoints
+    - the expected imbalance of x is read off prefix sums
+      over the scenarios sorted by demand, in O(log |S|)
+    - the CVaR of the imbalance cost of x is the
+      Rockafellar-Uryasev formula at the alpha-quantile,
+      computed in O(|S|) with a selection instead of a sort
+The objective is convex in x, so the optimal x is the root
+of its derivative over [sum pgmin, sum pgmax].
+"""
+from typing import Optional
+
+import numpy as np
+
+from pyomo.environ import SolverFactory, TerminationCondition, value
+
+from instances.generate import GENERATORS, Scenarios, build_instance
+from models.sded_cvar import model as cvar_model
+
+
+class CVaRDispatch:
+    """
+    SDED-CVaR over a fixed set of scenarios, with
+        - alpha: CVaR parameter, as in models/sded_cvar.py
+        - generators: generation unit parameters, as in
+          instances.generate.GENERATORS
+    """
+
+    def __init__(
+        self,
+        scenarios: Scenarios,
+        alpha: float,
+        generators: Optional[dict] = None,
+    ):
+        if generators is None:
+            generators = GENERATORS
+
+        self.alpha = alpha
+
+        # Generation units
+        self.cq = np.array(list(generators["cq"].values()), dtype=float)
+        self.cl = np.array(list(generators["cl"].values()), dtype=float)
+        self.cb = np.array(list(generators["cb"].values()), dtype=float)
+        self.pgmin = np.array(list(generators["pgmin"].values()), dtype=float)
+        self.pgmax = np.array(list(generators["pgmax"].values()), dtype=float)
+
+        # Marginal cost breakpoints of the merit-order split,
+        # and the total generation at each of them
+        self._lambdas = np.sort(
+            np.concatenate(
+                [
+                    self.cl + 2 * self.cq * self.pgmin,
+                    self.cl + 2 * self.cq * self.pgmax,
+                ]
+            )
+        )
+        self._totals = self._split(self._lambdas).sum(axis=1)
+
+        # Scenarios sorted by demand
+        n_scenarios = len(scenarios.pd0)
+        if scenarios.pi is None:
+            pi = np.full(n_scenarios, 1 / float(n_scenarios))
+        else:
+            pi = np.asarray(scenarios.pi, dtype=float)
+        self._equiprobable = scenarios.pi is None
+
+        order = np.argsort(scenarios.pd0, kind="stable")
+        self.pd0 = np.asarray(scenarios.pd0, dtype=float)[order]
+        self.la_c = np.asarray(scenarios.la_c, dtype=float)[order]
+        self.la_s = np.asarray(scenarios.la_s, dtype=float)[order]
+        self.pi = pi[order]
+
+        def _prefix(arr: np.ndarray) -> np.ndarray:
+            return np.concatenate([[0.0], np.cumsum(arr)])
+
+        self._pi_la_s = self.pi * self.la_s
+        self._pi_la_c = self.pi * self.la_c
+
+        self._cum_la_s = _prefix(self._pi_la_s)
+        self._cum_la_s_pd0 = _prefix(self._pi_la_s * self.pd0)
+        self._cum_la_c = _prefix(self._pi_la_c)
+        self._cum_la_c_pd0 = _prefix(self._pi_la_c * self.pd0)
+
+    def _split(self, lam: np.ndarray) -> np.ndarray:
+        return np.clip(
+            (lam[:, None] - self.cl) / (2 * self.cq), self.pgmin, self.pgmax
+        )
+
+    def dispatch(self, x: float) -> np.ndarray:
+        """
+        Least-cost P_G with total generation x: every unit
+        not at a bound runs at the same marginal cost lambda
+        """
+        lam = np.interp(x, self._totals, self._lambdas)
+        return self._split(np.array([lam]))[0]
+
+    def generation_cost(self, x: float) -> float:
+        p_g = self.dispatch(x)
+        return float(np.sum(self.cq * p_g**2 + self.cl * p_g + self.cb))
+
+    def expected_imbalance(self, x: float) -> float:
+        # Scenarios [0, k) have a surplus, scenarios [k, |S|) a curtailment
+        k = np.searchsorted(self.pd0, x, side="right")
+        surplus = x * self._cum_la_s[k] - self._cum_la_s_pd0[k]
+        curtailment = (self._cum_la_c_pd0[-1] - self._cum_la_c_pd0[k]) - x * (
+            self._cum_la_c[-1] - self._cum_la_c[k]
+        )
+        return float(surplus + curtailment)
+
+    def imbalance_costs(self, x: float) -> np.ndarray:
+        k = np.searchsorted(self.pd0, x, side="right")
+        losses = np.empty_like(self.pd0)
+        np.multiply(self.la_s[:k], x - self.pd0[:k], out=losses[:k])
+        np.multiply(self.la_c[k:], self.pd0[k:] - x, out=losses[k:])
+        return losses
+
+    def _var(self, losses: np.ndarray) -> float:
+        # alpha-quantile of the imbalance costs
+        if self._equiprobable:
+            i = max(int(np.ceil(self.alpha * len(losses))) - 1, 0)
+            return np.partition(losses, i)[i]
+
+        order = np.argsort(losses)
+        i = np.searchsorted(np.cumsum(self.pi[order]), self.alpha)
+        return losses[order][min(i, len(losses) - 1)]
+
+    def _cvar(self, x: float) -> tuple[float, float]:
+        """
+        CVaR of the imbalance cost L as VaR + 1/(1 - alpha) E[(L - VaR)^+],
+        with VaR the alpha-quantile of L, and its derivative in x
+        """
+        losses = self.imbalance_costs(x)
+        var = self._var(losses)
+
+        excess = losses - var
+        cvar = var + np.dot(self.pi, np.maximum(excess, 0)) / (1.0 - self.alpha)
+
+        # Scenarios [0, k) have a surplus, scenarios [k, |S|) a curtailment
+        k = np.searchsorted(self.pd0, x, side="right")
+        above = excess > 0
+        slope = np.dot(above[:k], self._pi_la_s[:k]) - np.dot(
+            above[k:], self._pi_la_c[k:]
+        )
+
+        # The scenarios at VaR only count for the probability
+        # exceeding alpha
+        at = np.flatnonzero(excess == 0)
+        at_slopes = np.where(at < k, self.la_s[at], -self.la_c[at])
+        prob_above = np.dot(self.pi, above)
+        slope += (1.0 - prob_above - self.alpha) * np.mean(at_slopes)
+
+        return float(cvar), float(slope / (1.0 - self.alpha))
+
+    def cvar(self, x: float) -> float:
+        return self._cvar(x)[0]
+
+    def objective(self, x: float, beta: float) -> float:
+        obj = self.generation_cost(x) + (1 - beta) * self.expected_imbalance(x)
+        if beta > 0:
+            obj += beta * self.cvar(x)
+        return obj
+
+    def derivative(self, x: float, beta: float) -> float:
+        """
+        Derivative of the objective in x: the marginal cost
+        lambda of the dispatch plus the slopes of the
+        expected imbalance and of the CVaR
+        """
+        lam = np.interp(x, self._totals, self._lambdas)
+
+        k = np.searchsorted(self.pd0, x, side="right")
+        imbalance_slope = self._cum_la_s[k] - (self._cum_la_c[-1] - self._cum_la_c[k])
+
+        slope = lam + (1 - beta) * imbalance_slope
+        if beta > 0:
+            slope += beta * self._cvar(x)[1]
+        return float(slope)
+
+    def _pieces(self, x: float) -> tuple:
+        """
+        Identifies the piece of the objective around x, over which
+        the derivative is affine in x: the merit-order segment,
+        the surplus scenarios, the scenarios at VaR and in the tail
+        """
+        losses = self.imbalance_costs(x)
+        var = self._var(losses)
+
+        return (
+            int(np.searchsorted(self._totals, x)),
+            int(np.searchsorted(self.pd0, x, side="right")),
+            tuple(np.flatnonzero(losses == var)),
+            hash((losses > var).tobytes()),
+        )
+
+    def regime(self, x: float, h: float = 1e-5) -> tuple:
+        """
+        Pieces of the objective on both sides of the solution x.
+        Over the betas whose solutions share a regime, the
+        solution is affine in beta: when both sides are the
+        same piece, it is the root of an affine derivative;
+        otherwise it is pinned at the kink between them.
+        """
+        return self._pieces(x - h), self._pieces(x + h)
+
+    def solve(
+        self, beta: float, x0: Optional[float] = None, xtol: float = 1e-6
+    ) -> float:
+        """
+        Optimal total generation: as the objective is convex,
+        the root of its (non-decreasing) derivative, found
+        with Brent's method. A guess x0 (e.g. the solution
+        of a close beta) narrows the initial bracket.
+        """
+        from scipy.optimize import brentq
+
+        lo, hi = self.pgmin.sum(), self.pgmax.sum()
+
+        if x0 is not None:
+            step = 1.0
+            while step < hi - lo:
+                lo_guess, hi_guess = max(x0 - step, lo), min(x0 + step, hi)
+                if self.derivative(lo_guess, beta) < 0 < self.derivative(
+                    hi_guess, beta
+                ):
+                    return brentq(
+                        self.derivative, lo_guess, hi_guess, args=(beta,), xtol=xtol
+                    )
+                step *= 10
+
+        if self.derivative(lo, beta) >= 0:
+            return lo
+        if self.derivative(hi, beta) <= 0:
+            return hi
+        return brentq(self.derivative, lo, hi, args=(beta,), xtol=xtol)
+
+    def row(self, beta: float, x: float) -> dict:
+        """
+        Row of results, with the same columns as
+        sweeps.collect_results, of the total generation x
+        for beta (e.g. read off a traced frontier)
+        """
+        val_term1 = self.generation_cost(x)
+        val_term2 = self.expected_imbalance(x)
+        val_term3 = self.cvar(x)
+
+        return {
+            "Model": "CVaR",
+            "Beta": beta,
+            "Objective": val_term1 + (1 - beta) * val_term2 + beta * val_term3,
+            "Generation_Cost": val_term1,
+            "Expected_Imbalance": val_term2,
+            "Risk_Measure": val_term3,
+            "Total_Expected_Cost": val_term1 + val_term2,
+            "Average_Scenario_Demand": float(np.sum(self.pi * self.pd0)),
+            "Total_Generation": float(x),
+        }
+
+    def results(self, beta: float) -> dict:
+        """
+        Solve for beta and return a row with the same
+        columns as sweeps.collect_results
+        """
+        return self.row(beta, self.solve(beta))
+
+    def frontier(self, beta_values: np.ndarray) -> list[dict]:
+        """
+        Rows of results for every beta, each solve
+        started from the solution of the previous beta
+        """
+        rows = []
+        x = None
+        for beta in beta_values:
+            x = self.solve(beta, x)
+            rows.append(self.row(beta, x))
+        return rows
+
+
+def validate_against_pyomo(
+    scenarios: Scenarios, beta: float, alpha: float
+) -> tuple[float, float]:
+    """
+    Solve the same instance with models/sded_cvar.py and HiGHS.
+    Returns the objective of both solvers (specialized, HiGHS).
+    """
+    inst = build_instance(
+        abstract_model=cvar_model,
+        **scenarios._asdict(),
+        beta=beta,
+        alpha=alpha,
+    )
+
+    sol = SolverFactory("highs").solve(inst)
+    if sol.solver.termination_condition != TerminationCondition.optimal:
+        raise RuntimeError(
+            f"HiGHS did not solve the SDED-CVaR instance (Beta {beta}): "
+            f"{sol.solver.termination_condition}"
+        )
+
+    return CVaRDispatch(scenarios, alpha).results(beta)["Objective"], value(inst.obj)
@@ -0,0 +1,259 @@
+"""
+This module contains a multi-cut L-shaped (Benders)
+decomposition of the
+    Stochastic Demand Economic Dispatch (SDED) with CVaR as Risk Measure
+for scenario sets too large for the monolithic model:
+    - the master problem (models/sded_cvar_master.py) holds
+      the dispatch P_G, the VaR, and a lower approximation
+      theta[b] of the recourse of every bundle b of scenarios
+    - the recourse of a bundle (its Power_Balance and
+      CVaR_Def blocks) only depends on the total generation
+      x = sum(P_G) and on the VaR, and splits into one 1-D
+      piecewise-linear LP per scenario, so its value and
+      its dual (a subgradient) are computed in closed form
+    - the bundles are evaluated in parallel worker processes,
+      which read the scenarios from one shared memory block
+      (so the memory does not grow with the number of workers)
+Every iteration adds one optimality cut per bundle, until
+the gap between the master objective (lower bound) and the
+best objective of the master iterates (upper bound) closes.
+"""
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from pyomo.contrib.solver.solvers.highs import Highs
+from pyomo.environ import value
+
+from instances.generate import GENERATORS, Scenarios
+from models.sded_cvar_master import model as master_model
+
+# Bundles of scenarios of a worker process, views of the shared memory block
+_BUNDLES = None
+_ALPHA = None
+_SHARED = None
+
+
+def _with_pi(scenarios: Scenarios) -> Scenarios:
+    if scenarios.pi is not None:
+        return scenarios
+    n_scenarios = len(scenarios.pd0)
+    return scenarios._replace(pi=np.full(n_scenarios, 1 / float(n_scenarios)))
+
+
+def split_bundles(scenarios: Scenarios, n_bundles: int) -> list[Scenarios]:
+    """
+    Split the scenarios into n_bundles contiguous bundles,
+    with the (unconditional) scenario probabilities. The
+    bundles are views of the arrays of scenarios.
+    """
+    splits = [np.array_split(np.asarray(arr), n_bundles) for arr in _with_pi(scenarios)]
+    return [Scenarios(*arrays) for arrays in zip(*splits)]
+
+
+def _share_scenarios(scenarios: Scenarios) -> SharedMemory:
+    # Copy of the scenarios (pd0, la_c, la_s, pi rows) in a shared memory block
+    table = np.array(_with_pi(scenarios), dtype=float)
+    shared = SharedMemory(create=True, size=table.nbytes)
+    np.ndarray(table.shape, dtype=float, buffer=shared.buf)[:] = table
+    return shared
+
+
+def _attach(name: str) -> SharedMemory:
+    # The block is unlinked by the parent, not by the resource tracker of the workers
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def bundle_recourse(
+    bundle: Scenarios, x: float, var: float, beta: float, alpha: float
+) -> tuple[float, float, float]:
+    """
+    Recourse of a bundle at (x, VaR):
+        sum pi * ((1 - beta) * L + beta / (1 - alpha) * (L - VaR)^+)
+    with L the imbalance cost of each scenario, and its
+    subgradient in x and in VaR
+    """
+    curtailment = bundle.pd0 > x
+    losses = np.where(
+        curtailment, bundle.la_c * (bundle.pd0 - x), bundle.la_s * (x - bundle.pd0)
+    )
+    slopes = np.where(curtailment, -bundle.la_c, bundle.la_s)
+
+    tail = losses > var
+    weights = (1 - beta) + beta / (1 - alpha) * tail
+
+    recourse = np.dot(bundle.pi, (1 - beta) * losses) + beta / (1 - alpha) * np.dot(
+        bundle.pi, np.maximum(losses - var, 0)
+    )
+    grad_x = np.dot(bundle.pi, weights * slopes)
+    grad_var = -beta / (1 - alpha) * np.sum(bundle.pi[tail])
+
+    return float(recourse), float(grad_x), float(grad_var)
+
+
+def _init_worker(name: str, n_scenarios: int, n_bundles: int, alpha: float):
+    global _BUNDLES, _ALPHA, _SHARED
+    _SHARED = _attach(name)
+    table = np.ndarray(
+        (len(Scenarios._fields), n_scenarios), dtype=float, buffer=_SHARED.buf
+    )
+    _BUNDLES = split_bundles(Scenarios(*table), n_bundles)
+    _ALPHA = alpha
+
+
+def _recourse_task(task: tuple) -> tuple[float, float, float]:
+    b, x, var, beta = task
+    return bundle_recourse(_BUNDLES[b], x, var, beta, _ALPHA)
+
+
+class LShapedResult(NamedTuple):
+    P_G: dict
+    VaR: float
+    objective: float
+    converged: bool
+    history: list[dict]
+
+
+def solve_lshaped(
+    scenarios: Scenarios,
+    beta: float,
+    alpha: float,
+    n_bundles: int = 8,
+    max_workers: Optional[int] = 1,
+    tol: float = 1e-6,
+    max_iter: int = 200,
+    generators: Optional[dict] = None,
+    verbose: bool = True,
+) -> LShapedResult:
+    """
+    Solve the SDED-CVaR by L-shaped decomposition, until the
+    relative gap between the bounds is below tol. With
+    max_workers = 1 the bundles are evaluated in this process.
+
+    The history holds, per iteration, the bounds, the gap,
+    the number of cuts of the master and the elapsed time.
+    """
+    if generators is None:
+        generators = GENERATORS
+
+    bundles = split_bundles(scenarios, n_bundles)
+
+    # The VaR never exceeds the largest imbalance cost
+    x_min = sum(generators["pgmin"].values())
+    x_max = sum(generators["pgmax"].values())
+    var_max = max(
+        float(np.max(bundle.la_c * (bundle.pd0 - x_min))) for bundle in bundles
+    )
+    var_max = max(
+        var_max,
+        max(float(np.max(bundle.la_s * (x_max - bundle.pd0))) for bundle in bundles),
+        0.0,
+    )
+
+    master = master_model.create_instance(
+        data={
+            None: {
+                "G": {None: list(generators["cq"])},
+                "B": {None: list(range(n_bundles))},
+                **generators,
+                "beta": {None: beta},
+                "VaR_max": {None: var_max},
+            }
+        }
+    )
+    solver = Highs()
+
+    global _BUNDLES, _ALPHA
+    shared = None
+    if max_workers == 1:
+        _BUNDLES, _ALPHA = bundles, alpha
+        executor = None
+    else:
+        # The workers read their bundles from a shared copy of the scenarios
+        shared = _share_scenarios(scenarios)
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(shared.name, len(scenarios.pd0), n_bundles, alpha),
+        )
+
+    history = []
+    best = None  # (upper bound, P_G, VaR)
+    converged = False
+    tic = time.perf_counter()
+
+    try:
+        for iteration in range(1, max_iter + 1):
+            solver.solve(master)
+            lower_bound = value(master.obj)
+
+            x = value(master.x_expr)
+            var = value(master.VaR)
+            tasks = [(b, x, var, beta) for b in range(n_bundles)]
+
+            if executor is None:
+                recourses = [_recourse_task(task) for task in tasks]
+            else:
+                recourses = list(executor.map(_recourse_task, tasks))
+
+            upper_bound = (
+                value(master.term1_expr)
+                + beta * var
+                + sum(recourse for recourse, _, _ in recourses)
+            )
+            if best is None or upper_bound < best[0]:
+                best = (
+                    upper_bound,
+                    {g: value(master.P_G[g]) for g in master.G},
+                    var,
+                )
+
+            gap = (best[0] - lower_bound) / max(1.0, abs(best[0]))
+            history.append(
+                {
+                    "Iteration": iteration,
+                    "Lower_Bound": lower_bound,
+                    "Upper_Bound": best[0],
+                    "Gap": gap,
+                    "Cuts": len(master.Cuts),
+                    "Time": time.perf_counter() - tic,
+                }
+            )
+
+            if verbose:
+                print(
+                    f"{iteration:>4} | LB {lower_bound:.6f} | UB {best[0]:.6f} | "
+                    f"Gap {gap:.2e} | {history[-1]['Time']:.2f}s"
+                )
+
+            if gap <= tol:
+                converged = True
+                break
+
+            for b, (recourse, grad_x, grad_var) in enumerate(recourses):
+                master.Cuts.add(
+                    master.theta[b]
+                    >= recourse
+                    + grad_x * (master.x_expr - x)
+                    + grad_var * (master.VaR - var)
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+
+    return LShapedResult(
+        P_G=best[1],
+        VaR=best[2],
+        objective=best[0],
+        converged=converged,
+        history=history,
+    )
@@ -0,0 +1,440 @@
+"""
+This module contains the drivers which
+sweep the risk-aversion parameter beta
+of the SDED models and collect the
+objective terms of every solve
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from typing import Optional
+
+import numpy as np
+
+from pyomo.environ import AbstractModel, ConcreteModel, SolverFactory, value
+from pyomo.environ import TerminationCondition as LegacyTerminationCondition
+from pyomo.contrib.solver.common.results import TerminationCondition
+from pyomo.contrib.solver.solvers.highs import Highs
+
+from instances.generate import (
+    cached_scenarios,
+    generate_crn_instance,
+    generate_instance,
+)
+from instrumentation import instance_stats, log_run, solver_stats
+from results_store import ResultsSink
+from solvers.cvar_dispatch import CVaRDispatch
+from solvers.cvar_frontier import frontier_rows, trace_frontier
+
+
+def print_result(row: dict):
+    print(
+        f"{row['Model']:<15} | {row['Beta']:.2f}  | {row['Objective']:.2f}     | {row['Generation_Cost']:.2f}     | {row['Risk_Measure']:.2f}       | {row['Average_Scenario_Demand']:.2f}"
+    )
+
+
+def keep_row(row: dict, results: list, sink: Optional[ResultsSink]):
+    """
+    Keep a solved row: with a sink it is only written to the
+    store (the sweep memory stays constant, and the rows are
+    read back with results_store.read_results), otherwise it
+    is appended to results
+    """
+    if sink is None:
+        results.append(row)
+    else:
+        sink.write(row)
+
+
+def collect_results(
+    model_name: str, beta: float, inst: ConcreteModel, verbose: bool = True
+) -> dict:
+    """
+    Read the objective terms of a solved instance
+    into a row of the results DataFrame
+    """
+    val_obj = value(inst.obj)
+    val_term1 = value(inst.term1_expr)
+    val_term2 = value(inst.term2_expr)
+    val_term3 = value(inst.term3_expr)
+
+    avg_demand = sum(value(inst.pi[s]) * value(inst.pd0[s]) for s in inst.S)
+    total_generation = sum(value(inst.P_G[g]) for g in inst.G)
+
+    row = {
+        "Model": model_name,
+        "Beta": beta,
+        "Objective": val_obj,
+        "Generation_Cost": val_term1,
+        "Expected_Imbalance": val_term2,
+        "Risk_Measure": val_term3,
+        "Total_Expected_Cost": val_term1 + val_term2,
+        "Average_Scenario_Demand": avg_demand,
+        "Total_Generation": total_generation,
+    }
+
+    if verbose:
+        print_result(row)
+
+    return row
+
+
+def persistent_highs() -> Highs:
+    """
+    HiGHS persistent interface which, between solves,
+    only pushes the changes of the mutable parameters
+    (i.e. the objective coefficients depending on beta)
+    """
+    solver = Highs()
+    solver.config.load_solutions = False
+    solver.config.raise_exception_on_nonoptimal_result = False
+
+    auto_updates = solver.config.auto_updates
+    auto_updates.check_for_new_or_removed_constraints = False
+    auto_updates.check_for_new_or_removed_vars = False
+    auto_updates.check_for_new_or_removed_params = False
+    auto_updates.check_for_new_objective = False
+    auto_updates.update_constraints = False
+    auto_updates.update_vars = False
+    auto_updates.update_named_expressions = False
+    auto_updates.update_objective = False
+    auto_updates.update_parameters = True
+
+    return solver
+
+
+def instrumented_solve(
+    model_name: str,
+    beta: float,
+    inst: ConcreteModel,
+    solver: Highs,
+    stats: dict,
+    log_path: Optional[str] = None,
+    verbose: bool = True,
+) -> tuple[Optional[dict], dict]:
+    """
+    Solve inst and return its results row, extended with
+    the instance stats and the solver statistics (None if
+    HiGHS did not reach optimality), and the record of the
+    run, which is appended to the log at log_path whether
+    the run was optimal or not.
+    """
+    sol = solver.solve(inst)
+    stats = {**stats, **solver_stats(sol)}
+
+    row = None
+    if sol.termination_condition == TerminationCondition.convergenceCriteriaSatisfied:
+        sol.solution_loader.load_vars()
+        row = {**collect_results(model_name, beta, inst, verbose=verbose), **stats}
+    elif verbose:
+        print(
+            f"Warning: {model_name} (Beta {beta}) infeasible or failed "
+            f"({stats['Termination']})."
+        )
+
+    record = {
+        "Model": model_name,
+        "Beta": float(beta),
+        "Objective": None if row is None else row["Objective"],
+        **stats,
+    }
+    log_run(log_path, record)
+
+    return row, record
+
+
+def _make_instance(
+    abstract_model: AbstractModel,
+    n_scenarios: int,
+    sigma: float,
+    beta: float,
+    alpha: Optional[float],
+    rng: np.random.Generator,
+    crn_seed: Optional[int],
+    n_reduced: Optional[int],
+) -> ConcreteModel:
+    if crn_seed is not None:
+        return generate_crn_instance(
+            abstract_model=abstract_model,
+            n_scenarios=n_scenarios,
+            sigma=sigma,
+            beta=beta,
+            alpha=alpha,
+            seed=crn_seed,
+            n_reduced=n_reduced,
+        )
+
+    return generate_instance(
+        abstract_model=abstract_model,
+        n_scenarios=n_scenarios,
+        sigma=sigma,
+        beta=beta,
+        alpha=alpha,
+        rng=rng,
+        n_reduced=n_reduced,
+    )
+
+
+def persistent_sweep(
+    abstract_model: AbstractModel,
+    model_name: str,
+    beta_values: np.ndarray,
+    n_scenarios: int,
+    sigma: float,
+    alpha: Optional[float],
+    rng: np.random.Generator,
+    crn_seed: Optional[int] = None,
+    n_reduced: Optional[int] = None,
+    instrument: bool = False,
+    log_path: Optional[str] = None,
+    sink: Optional[ResultsSink] = None,
+) -> list[dict]:
+    """
+    Sweep beta over a single instance of the model:
+    the instance is built (and written to HiGHS) once, and
+    each beta only updates the objective coefficients, so
+    HiGHS re-solves warm-started from the previous basis.
+
+    Unlike the rebuild sweep of main.py, all betas share
+    the same demand sample. When crn_seed is given, it is
+    the cached sample of that seed instead of a draw from rng.
+
+    The model must declare beta as a mutable Param.
+
+    With instrument, the rows hold the statistics of
+    instrumentation.py too. The instance is only built
+    for the first beta, so Build_Time is 0 for the others.
+
+    With a sink, every row is written to it (only) as soon
+    as it is solved, and [] is returned. The betas already in
+    the sink are skipped (the instance is still built, as it
+    draws from rng).
+    """
+    if not abstract_model.beta.mutable:
+        raise ValueError(
+            f"{abstract_model.name} declares beta as an immutable Param"
+        )
+
+    tic = time.perf_counter()
+    inst = _make_instance(
+        abstract_model=abstract_model,
+        n_scenarios=n_scenarios,
+        sigma=sigma,
+        beta=beta_values[0],
+        alpha=alpha,
+        rng=rng,
+        crn_seed=crn_seed,
+        n_reduced=n_reduced,
+    )
+
+    build_time = time.perf_counter() - tic
+
+    solver = persistent_highs()
+    stats = instance_stats(inst, build_time) if instrument else None
+
+    results = []
+    for beta in beta_values:
+        if sink is not None and (model_name, beta) in sink:
+            continue
+
+        inst.beta.set_value(float(beta))
+
+        if instrument:
+            row, _ = instrumented_solve(
+                model_name, beta, inst, solver, stats, log_path
+            )
+            if row is not None:
+                keep_row(row, results, sink)
+            stats = {**stats, "Build_Time": 0.0}
+            continue
+
+        sol = solver.solve(inst)
+
+        if (
+            sol.termination_condition
+            == TerminationCondition.convergenceCriteriaSatisfied
+        ):
+            sol.solution_loader.load_vars()
+            row = collect_results(model_name, beta, inst)
+            keep_row(row, results, sink)
+        else:
+            print(f"Warning: {model_name} (Beta {beta}) infeasible or failed.")
+
+    return results
+
+
+def adaptive_cvar_sweep(
+    model_name: str,
+    beta_values: np.ndarray,
+    n_scenarios: int,
+    sigma: float,
+    alpha: float,
+    seed: int,
+    n_reduced: Optional[int] = None,
+    sink: Optional[ResultsSink] = None,
+) -> list[dict]:
+    """
+    CVaR frontier traced adaptively (see solvers/cvar_frontier.py)
+    over the cached sample of seed, and then evaluated at every
+    beta of beta_values without solving them.
+
+    The breakpoints get dense as the number of scenarios
+    grows, so this pays off for small (or reduced) samples.
+
+    With a sink, the rows are written to it (only), and []
+    is returned; the betas already in the sink are skipped.
+    """
+    engine = CVaRDispatch(cached_scenarios(n_scenarios, sigma, seed, n_reduced), alpha)
+    frontier = trace_frontier(
+        engine, beta_min=float(beta_values[0]), beta_max=float(beta_values[-1])
+    )
+
+    print(
+        f"{model_name}: {frontier.n_solves} solves, "
+        f"{len(frontier.segments)} segments, breakpoints at Beta "
+        + ", ".join(f"{beta:.4f}" for beta in frontier.breakpoints)
+    )
+
+    results = []
+    for row in frontier_rows(engine, frontier, beta_values):
+        if sink is not None and (model_name, row["Beta"]) in sink:
+            continue
+        print_result(row)
+        keep_row(row, results, sink)
+
+    return results
+
+
+def _solve_task(task: tuple):
+    """
+    Build and solve a single (model, beta) instance.
+    The AbstractModel is imported by module name in the
+    worker, as its rules cannot be pickled.
+
+    Returns the results row (None if not optimal), or,
+    with instrument, the (row, record) of instrumented_solve.
+    """
+    (
+        model_name,
+        module_name,
+        beta,
+        alpha,
+        n_scenarios,
+        sigma,
+        seed_seq,
+        crn_seed,
+        n_reduced,
+        instrument,
+    ) = task
+
+    tic = time.perf_counter()
+    inst = _make_instance(
+        abstract_model=import_module(module_name).model,
+        n_scenarios=n_scenarios,
+        sigma=sigma,
+        beta=beta,
+        alpha=alpha,
+        rng=np.random.default_rng(seed_seq),
+        crn_seed=crn_seed,
+        n_reduced=n_reduced,
+    )
+    build_time = time.perf_counter() - tic
+
+    if instrument:
+        return instrumented_solve(
+            model_name,
+            beta,
+            inst,
+            persistent_highs(),
+            instance_stats(inst, build_time),
+            verbose=False,
+        )
+
+    sol = SolverFactory("highs").solve(inst)
+
+    if sol.solver.termination_condition == LegacyTerminationCondition.optimal:
+        return collect_results(model_name, beta, inst, verbose=False)
+    return None
+
+
+def parallel_sweep(
+    models_config: dict,
+    beta_values: np.ndarray,
+    n_scenarios: int,
+    sigma: float,
+    seed: int,
+    max_workers: Optional[int] = None,
+    common_random_numbers: bool = False,
+    n_reduced: Optional[int] = None,
+    instrument: bool = False,
+    log_path: Optional[str] = None,
+    sink: Optional[ResultsSink] = None,
+) -> list[dict]:
+    """
+    Solve the (model, beta) grid over a process pool.
+    models_config maps each model name to the module
+    defining its AbstractModel and its alpha.
+
+    Every task samples its demand from its own stream,
+    spawned from seed, so the results do not depend on
+    max_workers nor on the order tasks are completed in.
+    With common_random_numbers, every task instead uses
+    the cached sample of seed (cached once per worker).
+
+    With instrument, the log at log_path is written by
+    the parent process, in the order of the grid.
+
+    With a sink, every row is written to it (only) as soon
+    as it is collected, and [] is returned. The (model, beta)
+    already in the sink are skipped. The remaining tasks keep
+    their streams, so a resumed sweep gives the rows of an
+    uninterrupted one.
+    """
+    grid = [
+        (model_name, config["module"].__name__, beta, config["alpha"])
+        for model_name, config in models_config.items()
+        for beta in beta_values
+    ]
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(grid))
+    crn_seed = seed if common_random_numbers else None
+
+    tasks = [
+        (
+            model_name,
+            module_name,
+            beta,
+            alpha,
+            n_scenarios,
+            sigma,
+            seed_seq,
+            crn_seed,
+            n_reduced,
+            instrument,
+        )
+        for (model_name, module_name, beta, alpha), seed_seq in zip(grid, seed_seqs)
+        if sink is None or (model_name, beta) not in sink
+    ]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for task, output in zip(tasks, executor.map(_solve_task, tasks)):
+            model_name, beta = task[0], task[2]
+
+            if instrument:
+                row, record = output
+                log_run(log_path, record)
+            else:
+                row = output
+
+            if row is not None:
+                print_result(row)
+                keep_row(row, results, sink)
+            elif instrument:
+                print(
+                    f"Warning: {model_name} (Beta {beta}) infeasible or failed "
+                    f"({record['Termination']})."
+                )
+            else:
+                print(f"Warning: {model_name} (Beta {beta}) infeasible or failed.")
+
+    return results
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from models import sded_cvar, sded_mean_variance
+from sweeps import parallel_sweep
+
+MODELS_CONFIG = {
+    "Mean-Variance": {"module": sded_mean_variance, "alpha": None},
+    "CVaR": {"module": sded_cvar, "alpha": 0.05},
+}
+
+
+def test_parallel_sweep_does_not_depend_on_workers():
+    def sweep(max_workers):
+        return pd.DataFrame(
+            parallel_sweep(
+                models_config=MODELS_CONFIG,
+                beta_values=np.array([0.0, 0.5, 1.0]),
+                n_scenarios=20,
+                sigma=0.05,
+                seed=1234,
+                max_workers=max_workers,
+            )
+        )
+
+    serial, parallel = sweep(1), sweep(2)
+    assert len(serial) == 6
+    pd.testing.assert_frame_equal(serial, parallel, check_exact=True)